@@ -10,16 +10,22 @@ headers, HOW/WHY comments, and data table documentation.
 
 Usage:
     python annotate_genetic_drift_final.py
+    python annotate_genetic_drift_final.py --snapshot before.json
+    python annotate_genetic_drift_final.py --diff before.json
 
 Input:  archaeology/games/action/Genetic Drift (Broderbund 1981)/disassembly/genetic_drift_annotated.s
 Output: archaeology/games/action/Genetic Drift (Broderbund 1981)/genetic_drift_source.s
 """
 
+import argparse
 import os
 import re
 import sys
 from pathlib import Path
 
+from disasm6502 import (build_snapshot, diff_snapshots, format_snapshot_diff,
+                        load_snapshot, save_snapshot)
+
 # ═══════════════════════════════════════════════════════════════════════
 #                         KNOWLEDGE BASE
 # ═══════════════════════════════════════════════════════════════════════
@@ -2211,6 +2217,61 @@ def add_memory_comments(lines):
     return result
 
 
+LISTING_LINE = re.compile(
+    r'^([0-9A-Fa-f]{6})\s+([0-9A-Fa-f]{2}(?: [0-9A-Fa-f]{2}){0,2}|[0-9A-Fa-f]+)'
+    r'\s+(?:(\w+)\s+)?(HEX|[a-z]{3})\b([^;]*)(?:;\s*(.*))?$')
+
+
+def snapshot_from_listing(lines):
+    """Build an address-keyed analysis snapshot from transformed output.
+
+    Regions are runs of instructions (code) or HEX blocks (data), labels
+    are the names in the label column, and comments are the comment block
+    injected before an address plus its inline comment.  See
+    disasm6502.build_snapshot() for the format.
+    """
+    entries = []            # (addr, size, kind)
+    labels = {}
+    comments = {}
+    pending = []            # comment lines waiting for the next address
+    seen_code = False
+    for line in lines:
+        for sub in line.split('\n'):
+            stripped = sub.strip()
+            if stripped.startswith(';'):
+                if seen_code:
+                    pending.append(stripped)
+                continue
+            m = LISTING_LINE.match(sub)
+            if not m:
+                continue
+            seen_code = True
+            addr = int(m.group(1), 16)
+            mnem = m.group(4)
+            if mnem == 'HEX':
+                size = len(m.group(5).replace(' ', '').strip()) // 2
+                kind = 'data'
+            else:
+                size = len(m.group(2).split())
+                kind = 'code'
+            entries.append((addr, max(size, 1), kind))
+            if m.group(3):
+                labels[addr] = m.group(3)
+            text = pending + (['; ' + m.group(6).strip()] if m.group(6) else [])
+            if text:
+                comments[addr] = '\n'.join(text)
+            pending = []
+
+    regions = []
+    for addr, size, kind in sorted(entries):
+        end = addr + size - 1
+        if regions and regions[-1][2] == kind and regions[-1][1] + 1 == addr:
+            regions[-1][1] = end
+        else:
+            regions.append([addr, end, kind])
+    return build_snapshot([tuple(r) for r in regions], labels, comments)
+
+
 def transform(input_path, output_path):
     """Main transformation: raw disassembly → clean annotated source."""
     with open(input_path, 'r', encoding='utf-8', errors='replace') as f:
@@ -2386,6 +2447,16 @@ def transform(input_path, output_path):
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Recover annotated Genetic Drift source from raw disassembly")
+    parser.add_argument("--snapshot", metavar="FILE",
+                        help="Also write an address-keyed snapshot of the output "
+                             "(labels, regions, comments) to FILE")
+    parser.add_argument("--diff", metavar="FILE",
+                        help="Compare the output against a saved snapshot and "
+                             "print changed labels, regions and comments")
+    args = parser.parse_args()
+
     base = Path(__file__).parent.parent
     title_dir = base / "archaeology" / "games" / "action" / "Genetic Drift (Broderbund 1981)"
     input_path = title_dir / "disassembly" / "genetic_drift_annotated.s"
@@ -2476,6 +2547,16 @@ def main():
 
     print(f"\nWrote: {output_path}")
 
+    if args.snapshot or args.diff:
+        snap = snapshot_from_listing(content.split('\n'))
+        if args.snapshot:
+            save_snapshot(args.snapshot, snap)
+            print(f"Snapshot: {args.snapshot}")
+        if args.diff:
+            print()
+            for line in format_snapshot_diff(diff_snapshots(load_snapshot(args.diff), snap)):
+                print(line)
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+"""
+6502 two-pass assembler and round-trip verifier for generated listings
+
+Reassembles the listings produced by this toolchain and byte-compares the
+result with the original binary, reporting the first divergent address.
+
+Understands the listing dialects the tools emit:
+  - annotate_genetic_drift_final.py: "0037D7  8D 10 C0   label  sta  CLRKBD"
+    plus HEX blocks and "name EQU $xx" equates
+  - disasm6502.py: "    $5875: 20 7F 45    JSR  sub_457F", "name:" label
+    lines, .BYTE / .WORD / .ASC data directives
+  - plain source: "label  LDA #$00", ORG / *= / EQU / = / DFB / DW / ASC
+
+The address column of a listing line sets the location counter for that
+line, so relocated blocks (Genetic Drift's $3800 -> $0000 copy) assemble
+at their runtime addresses while the output bytes stay in file order.
+
+Symbols a listing references but never defines (ROM entry points,
+soft-switch names, labels the annotator renamed) fall back to the
+address encoded in generated names (sub_FDED, L_4105) and then to the
+operand bytes shown in the listing's hex column; they are reported so
+the listing can be fixed.  Those operands cannot be verified against the
+binary, only against each other: every use of a symbol must give the
+same value (else status 1), and jump, call and branch targets should
+land on a listing line (else a warning).  A byte-exact result that
+relied on them exits with status 2.
+
+Usage:
+  python asm6502.py <listing.s> <binary.bin>
+  python asm6502.py ../genetic_drift_source.s ../extracted/genetic_drift_game_binary.bin
+  python asm6502.py listing.s binary.bin -o reassembled.bin
+"""
+
+import re
+import sys
+import argparse
+import time
+from pathlib import Path
+
+from disasm6502 import OPCODES, HARDWARE, BRANCH_MNEMONICS
+
+# ---------------------------------------------------------------------------
+# Opcode encoding table: (mnemonic, mode) -> opcode
+# ---------------------------------------------------------------------------
+
+ENCODE = {}
+MODES_BY_MNEMONIC = {}
+for _op, (_mnem, _mode, _size) in OPCODES.items():
+    ENCODE[(_mnem, _mode)] = _op
+    MODES_BY_MNEMONIC.setdefault(_mnem, set()).add(_mode)
+
+MODE_SIZE = {
+    "imp": 1, "acc": 1, "imm": 2, "rel": 2,
+    "zp": 2, "zpx": 2, "zpy": 2, "indx": 2, "indy": 2,
+    "abs": 3, "absx": 3, "absy": 3, "ind": 3,
+}
+
+# Directive spellings across the supported dialects
+BYTE_DIRECTIVES = {".BYTE", "DFB", "DB", ".DB"}
+WORD_DIRECTIVES = {".WORD", "DW", "DA", ".DW"}
+ASC_DIRECTIVES = {".ASC", "ASC"}
+HEX_DIRECTIVES = {"HEX", ".HEX"}
+ORG_DIRECTIVES = {"ORG", ".ORG", "*="}
+EQU_DIRECTIVES = {"EQU", ".EQU", "="}
+
+DIRECTIVES = (BYTE_DIRECTIVES | WORD_DIRECTIVES | ASC_DIRECTIVES
+              | HEX_DIRECTIVES | ORG_DIRECTIVES | EQU_DIRECTIVES)
+
+# annotate_genetic_drift_final.py: "0037D7  8D 10 C0      label  sta  CLRKBD"
+ANNOTATED_LINE = re.compile(
+    r'^([0-9A-Fa-f]{6})\s+((?:[0-9A-Fa-f]{2} ){0,2}[0-9A-Fa-f]{2}|[0-9A-Fa-f]+)\s+(.*)$')
+
+# disasm6502.py: "    $5875: 20 7F 45    JSR  sub_457F" / "    $4000:   .BYTE ..."
+DISASM_LINE = re.compile(
+    r'^\s+\$([0-9A-Fa-f]{4}):\s+((?:[0-9A-Fa-f?]{2} ){0,2}[0-9A-Fa-f?]{2}(?=\s))?\s*(.*)$')
+
+LABEL_LINE = re.compile(r'^([A-Za-z_][\w.]*):\s*$')
+
+# Generated label names that encode their own address (sub_FDED, L_4105)
+ADDRESS_NAME = re.compile(r'^(?:sub|jmp|loc|dat|irq|L)_(?:00)?([0-9A-Fa-f]{4})$')
+
+TOKEN = re.compile(r"\s*(\$[0-9A-Fa-f]+|%[01]+|\d+|'.'|[A-Za-z_][\w.]*|\*|[-+<>])")
+
+
+class AsmError(Exception):
+    """Syntax or encoding error on a listing line."""
+
+    def __init__(self, lineno, message):
+        Exception.__init__(self, "line {0}: {1}".format(lineno, message))
+        self.lineno = lineno
+
+
+class Undefined(Exception):
+    """Raised while evaluating an expression that uses an unknown symbol."""
+
+    def __init__(self, name):
+        Exception.__init__(self, name)
+        self.name = name
+
+
+# ===================================================================
+#  Line parsing
+# ===================================================================
+
+def _strip_comment(text):
+    """Remove a trailing ; comment, ignoring semicolons inside quotes."""
+    quote = None
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch == ";":
+            return text[:i]
+    return text
+
+
+def _is_opword(word):
+    upper = word.upper()
+    return upper in MODES_BY_MNEMONIC or upper in DIRECTIVES
+
+
+def parse_line(line):
+    """
+    Split a listing/source line into its parts.
+    Returns (addr_or_None, listed_bytes_or_None, label, op, operand) or
+    None for blank/comment lines.  *op* is upper-cased.
+    """
+    addr = None
+    listed = None
+    body = line
+
+    m = ANNOTATED_LINE.match(line)
+    if m:
+        addr = int(m.group(1), 16)
+        hexcol = m.group(2)
+        listed = bytes.fromhex(hexcol) if " " in hexcol or len(hexcol) == 2 else None
+        body = " " + m.group(3)
+    else:
+        m = DISASM_LINE.match(line)
+        if m:
+            addr = int(m.group(1), 16)
+            if m.group(2) and "?" not in m.group(2):
+                listed = bytes.fromhex(m.group(2))
+            body = " " + m.group(3)
+        else:
+            m = LABEL_LINE.match(line)
+            if m:
+                return None, None, m.group(1), None, ""
+
+    body = _strip_comment(body).rstrip()
+    if not body.strip():
+        return None
+
+    label = None
+    words = body.split(None, 1)
+    if not body[0].isspace() or not _is_opword(words[0]):
+        if len(words) > 1 and words[1].split(None, 1)[0].upper() in EQU_DIRECTIVES:
+            label = words[0].rstrip(":")
+            body = " " + words[1]
+        elif not _is_opword(words[0]):
+            label = words[0].rstrip(":")
+            body = " " + words[1] if len(words) > 1 else ""
+    words = body.split(None, 1)
+    if not words:
+        return addr, listed, label, None, ""
+    op = words[0].upper()
+    operand = words[1].strip() if len(words) > 1 else ""
+    return addr, listed, label, op, operand
+
+
+# ===================================================================
+#  Expressions
+# ===================================================================
+
+def evaluate(expr, symbols, pc):
+    """
+    Evaluate an operand expression: numbers ($hex, %bin, decimal, 'c'),
+    symbols, * (current pc), + and -, with optional < / > (low / high byte)
+    prefix.  Raises Undefined for unknown symbols.
+    """
+    expr = expr.strip()
+    part = None
+    if expr[:1] in "<>":
+        part = expr[0]
+        expr = expr[1:]
+
+    pos = 0
+    total = 0
+    sign = 1
+    expect_term = True
+    while pos < len(expr):
+        m = TOKEN.match(expr, pos)
+        if not m:
+            raise ValueError("bad expression: {0}".format(expr))
+        tok = m.group(1)
+        pos = m.end()
+        if tok in "+-" and len(tok) == 1:
+            if tok == "-":
+                sign = -sign
+            expect_term = True
+            continue
+        if not expect_term:
+            raise ValueError("bad expression: {0}".format(expr))
+        if tok.startswith("$"):
+            val = int(tok[1:], 16)
+        elif tok.startswith("%"):
+            val = int(tok[1:], 2)
+        elif tok.isdigit():
+            val = int(tok)
+        elif tok.startswith("'"):
+            val = ord(tok[1])
+        elif tok == "*":
+            val = pc
+        else:
+            if tok in symbols:
+                val = symbols[tok]
+            else:
+                m_addr = ADDRESS_NAME.match(tok)
+                if not m_addr:
+                    raise Undefined(tok)
+                val = int(m_addr.group(1), 16)
+        total += sign * val
+        sign = 1
+        expect_term = False
+    if expect_term:
+        raise ValueError("bad expression: {0}".format(expr))
+
+    if part == "<":
+        return total & 0xFF
+    if part == ">":
+        return (total >> 8) & 0xFF
+    return total
+
+
+def _split_args(operand):
+    """Split a directive argument list on commas outside quotes."""
+    args = []
+    quote = None
+    cur = []
+    for ch in operand:
+        if quote:
+            cur.append(ch)
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+            cur.append(ch)
+        elif ch == ",":
+            args.append("".join(cur).strip())
+            cur = []
+        else:
+            cur.append(ch)
+    if cur or args:
+        args.append("".join(cur).strip())
+    return [a for a in args if a]
+
+
+# ===================================================================
+#  Instruction encoding
+# ===================================================================
+
+def _operand_syntax(mnem, operand):
+    """
+    Return (candidate_modes, expression) for an instruction operand.
+    Candidate modes are ordered short form first.
+    """
+    modes = MODES_BY_MNEMONIC[mnem]
+    op = operand.replace(" ", "")
+    upper = op.upper()
+    if not op:
+        return [m for m in ("imp", "acc") if m in modes], None
+    if upper == "A" and "acc" in modes:
+        return ["acc"], None
+    if op.startswith("#"):
+        return ["imm"], op[1:]
+    if upper.startswith("(") and upper.endswith(",X)"):
+        return ["indx"], op[1:-3]
+    if upper.startswith("(") and upper.endswith("),Y"):
+        return ["indy"], op[1:-3]
+    if op.startswith("(") and op.endswith(")"):
+        return ["ind"], op[1:-1]
+    if upper.endswith(",X"):
+        return [m for m in ("zpx", "absx") if m in modes], op[:-2]
+    if upper.endswith(",Y"):
+        return [m for m in ("zpy", "absy") if m in modes], op[:-2]
+    if mnem in BRANCH_MNEMONICS:
+        return ["rel"], op
+    return [m for m in ("zp", "abs") if m in modes], op
+
+
+def _pick_mode(candidates, value, size_hint):
+    """Choose among zp/abs-style candidates using the listing or the value."""
+    if len(candidates) == 1:
+        return candidates[0]
+    if size_hint is not None:
+        for mode in candidates:
+            if MODE_SIZE[mode] == size_hint:
+                return mode
+    if value is not None and 0 <= value < 0x100:
+        return candidates[0]
+    return candidates[-1]
+
+
+# ===================================================================
+#  Assembler
+# ===================================================================
+
+class Assembly(object):
+    """Result of assembling a listing."""
+
+    def __init__(self):
+        self.chunks = []        # (addr, bytes, lineno) in listing order
+        self.symbols = {}
+        self.unresolved = {}    # symbol -> number of uses taken from listing bytes
+        self.fallback = {}      # symbol -> set of values taken from listing bytes
+        self.targets = set()    # symbols used as JMP/JSR/branch targets
+
+    @property
+    def data(self):
+        return b"".join(c[1] for c in self.chunks)
+
+
+def _hardware_symbols():
+    symbols = {}
+    for addr, name in HARDWARE.items():
+        symbols.setdefault(name, addr)
+    return symbols
+
+
+def assemble(lines, symbols=None):
+    """
+    Two-pass assembly of *lines*.
+
+    Pass 1 assigns every label and equate and fixes each line's size;
+    pass 2 encodes with the same sizes so forward references cannot
+    shift the layout.  Returns an Assembly.
+    """
+    result = Assembly()
+    syms = _hardware_symbols()
+    if symbols:
+        syms.update(symbols)
+
+    parsed = []
+    for lineno, line in enumerate(lines, 1):
+        p = parse_line(line.rstrip("\n"))
+        if p is not None:
+            parsed.append((lineno, p))
+
+    # ---- pass 1: symbols and sizes ----
+    sizes = []
+    pc = 0
+    pending_labels = []
+    for lineno, (addr, listed, label, op, operand) in parsed:
+        if addr is not None:
+            pc = addr
+        if op in EQU_DIRECTIVES:
+            try:
+                syms[label] = evaluate(operand, syms, pc)
+            except (Undefined, ValueError) as e:
+                raise AsmError(lineno, "cannot evaluate EQU: {0}".format(e))
+            sizes.append(0)
+            continue
+        if label:
+            pending_labels.append(label)
+        if op is None:
+            sizes.append(0)
+            continue
+        if op in ORG_DIRECTIVES:
+            pc = _org(lineno, operand, syms, pc)
+            sizes.append(0)
+            continue
+        for name in pending_labels:
+            syms[name] = pc
+        pending_labels = []
+        size = _line_size(lineno, op, operand, listed, syms, pc)
+        sizes.append(size)
+        pc += size
+
+    # ---- pass 2: encode ----
+    result.symbols = syms
+    pc = 0
+    for (lineno, (addr, listed, label, op, operand)), size in zip(parsed, sizes):
+        if addr is not None:
+            pc = addr
+        if op is None or op in EQU_DIRECTIVES:
+            continue
+        if op in ORG_DIRECTIVES:
+            pc = _org(lineno, operand, syms, pc)
+            continue
+        out = _encode_line(lineno, op, operand, listed, size, syms, pc, result)
+        if len(out) != size:
+            raise AsmError(lineno, "size changed between passes")
+        result.chunks.append((pc, out, lineno))
+        pc += size
+    return result
+
+
+def _org(lineno, operand, syms, pc):
+    """Evaluate an ORG / *= operand."""
+    try:
+        return evaluate(operand, syms, pc)
+    except (Undefined, ValueError) as e:
+        raise AsmError(lineno, "cannot evaluate ORG: {0}".format(e))
+
+
+def _line_size(lineno, op, operand, listed, syms, pc):
+    """Pass-1 size of a line."""
+    if op in HEX_DIRECTIVES:
+        return len(operand.replace(" ", "")) // 2
+    if op in BYTE_DIRECTIVES:
+        return len(_split_args(operand))
+    if op in WORD_DIRECTIVES:
+        return 2 * len(_split_args(operand))
+    if op in ASC_DIRECTIVES:
+        return len(_asc_bytes(lineno, op, operand))
+    if op not in MODES_BY_MNEMONIC:
+        raise AsmError(lineno, "unknown mnemonic {0}".format(op))
+    if op == "BRK" and operand.startswith("#"):
+        return 2
+    candidates, expr = _operand_syntax(op, operand)
+    if not candidates:
+        raise AsmError(lineno, "bad operand for {0}: {1}".format(op, operand))
+    value = None
+    if expr is not None:
+        try:
+            value = evaluate(expr, syms, pc)
+        except Undefined:
+            value = None
+        except ValueError as e:
+            raise AsmError(lineno, str(e))
+    hint = len(listed) if listed is not None and len(listed) <= 3 else None
+    return MODE_SIZE[_pick_mode(candidates, value, hint)]
+
+
+def _asc_bytes(lineno, op, operand):
+    """Encode an .ASC / ASC operand."""
+    m = re.match(r'^(["\'])(.*)\1\s*(\(high-bit\))?$', operand)
+    if not m:
+        raise AsmError(lineno, "bad string: {0}".format(operand))
+    text = m.group(2).encode("ascii")
+    # disasm6502 marks high-bit strings; Merlin sets bit 7 for "..." strings
+    if m.group(3) or (op == "ASC" and m.group(1) == '"'):
+        return bytes(b | 0x80 for b in text)
+    return text
+
+
+def _value(lineno, expr, syms, pc, listed, size, result, relative=False):
+    """
+    Evaluate an operand, falling back to the listing's hex column.
+    For a *relative* (branch) operand the fallback is the branch target.
+    """
+    try:
+        return evaluate(expr, syms, pc)
+    except Undefined as e:
+        if listed is None or len(listed) != size:
+            raise AsmError(lineno, "undefined symbol {0}".format(e.name))
+        if relative:
+            value = pc + 2 + (listed[1] - 256 if listed[1] >= 128 else listed[1])
+        elif size == 3:
+            value = listed[1] | (listed[2] << 8)
+        else:
+            value = listed[1]
+        result.unresolved[e.name] = result.unresolved.get(e.name, 0) + 1
+        result.fallback.setdefault(e.name, set()).add(value)
+        return value
+    except ValueError as e:
+        raise AsmError(lineno, str(e))
+
+
+def _encode_line(lineno, op, operand, listed, size, syms, pc, result):
+    """Pass-2 encoding of a line."""
+    if op in HEX_DIRECTIVES:
+        try:
+            return bytes.fromhex(operand.replace(" ", ""))
+        except ValueError:
+            raise AsmError(lineno, "bad HEX data")
+    if op in BYTE_DIRECTIVES:
+        out = bytearray()
+        for a in _split_args(operand):
+            try:
+                out.append(evaluate(a, syms, pc) & 0xFF)
+            except Undefined as e:
+                raise AsmError(lineno, "undefined symbol {0}".format(e.name))
+            except ValueError as e:
+                raise AsmError(lineno, str(e))
+        return bytes(out)
+    if op in WORD_DIRECTIVES:
+        out = bytearray()
+        for a in _split_args(operand):
+            try:
+                val = evaluate(a, syms, pc)
+            except Undefined as e:
+                raise AsmError(lineno, "undefined symbol {0}".format(e.name))
+            except ValueError as e:
+                raise AsmError(lineno, str(e))
+            out.append(val & 0xFF)
+            out.append((val >> 8) & 0xFF)
+        return bytes(out)
+    if op in ASC_DIRECTIVES:
+        return _asc_bytes(lineno, op, operand)
+
+    if op == "BRK" and operand.startswith("#"):
+        val = _value(lineno, operand[1:], syms, pc, listed, 2, result)
+        return bytes((0x00, val & 0xFF))
+
+    candidates, expr = _operand_syntax(op, operand)
+    mode = None
+    for cand in candidates:
+        if MODE_SIZE[cand] == size:
+            mode = cand
+            break
+    opcode = ENCODE[(op, mode)]
+    if size == 1:
+        return bytes((opcode,))
+    if mode == "rel" or (op in ("JMP", "JSR") and mode == "abs"):
+        result.targets.update(_symbols_in(expr))
+    val = _value(lineno, expr, syms, pc, listed, size, result, relative=mode == "rel")
+    if mode == "rel":
+        offset = val - (pc + 2)
+        if not -128 <= offset <= 127:
+            raise AsmError(lineno, "branch out of range")
+        return bytes((opcode, offset & 0xFF))
+    if size == 2:
+        if not 0 <= val <= 0xFF and mode != "imm":
+            raise AsmError(lineno, "operand ${0:X} does not fit zero page".format(val))
+        return bytes((opcode, val & 0xFF))
+    return bytes((opcode, val & 0xFF, (val >> 8) & 0xFF))
+
+
+def _symbols_in(expr):
+    """Names referenced by an operand expression."""
+    return set(t for t in TOKEN.findall(expr) if t[:1].isalpha() or t[:1] == "_")
+
+
+def check_fallbacks(assembly):
+    """
+    Cross-check the symbols resolved from listing bytes.
+
+    Returns (errors, warnings): symbols whose uses disagree on a value,
+    and jump/call/branch targets inside the assembled image that do not
+    start a listing line (code shown as HEX data, or a jump into the
+    middle of an instruction).
+    """
+    starts = set()
+    lo, hi = None, None
+    for addr, chunk, _ in assembly.chunks:
+        starts.add(addr)
+        if chunk:
+            lo = addr if lo is None else min(lo, addr)
+            hi = addr + len(chunk) if hi is None else max(hi, addr + len(chunk))
+    errors = []
+    warnings = []
+    for name in sorted(assembly.fallback):
+        values = assembly.fallback[name]
+        if len(values) > 1:
+            errors.append("{0} has different values: {1}".format(
+                name, ", ".join("${0:04X}".format(v) for v in sorted(values))))
+        elif name in assembly.targets:
+            value = next(iter(values))
+            if lo is not None and lo <= value < hi and value not in starts:
+                warnings.append("{0} = ${1:04X} is not the address of a listing "
+                                "line".format(name, value))
+    return errors, warnings
+
+
+# ===================================================================
+#  Verification
+# ===================================================================
+
+def first_divergence(assembly, binary):
+    """
+    Compare assembled bytes (in listing order) with *binary*.
+    Returns None when identical, else (file_offset, addr, lineno,
+    assembled_byte_or_None, binary_byte_or_None).
+    """
+    offset = 0
+    for addr, chunk, lineno in assembly.chunks:
+        expected = binary[offset:offset + len(chunk)]
+        if chunk != expected:
+            for k in range(len(chunk)):
+                got = binary[offset + k] if offset + k < len(binary) else None
+                if chunk[k] != got:
+                    return offset + k, addr + k, lineno, chunk[k], got
+        offset += len(chunk)
+    if offset != len(binary):
+        return offset, None, None, None, binary[offset] if offset < len(binary) else None
+    return None
+
+
+# ===================================================================
+#  Main
+# ===================================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Reassemble a 6502 listing and verify it against the binary",
+        epilog="Example: python asm6502.py ../genetic_drift_source.s "
+               "../extracted/genetic_drift_game_binary.bin")
+    parser.add_argument("listing", help="Listing or source file to assemble")
+    parser.add_argument("binary", nargs="?", default=None,
+                        help="Original binary to compare against")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Write the assembled bytes to this file")
+    parser.add_argument("--strict", action="store_true",
+                        help="Fail (status 1 instead of 2) when a symbol is "
+                             "resolved from listing bytes")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    listing_path = Path(args.listing)
+    if not listing_path.exists():
+        print("Error: file not found: {0}".format(listing_path), file=sys.stderr)
+        sys.exit(1)
+
+    t0 = time.time()
+    with open(listing_path, "r", encoding="utf-8", errors="replace") as f:
+        lines = f.readlines()
+    try:
+        assembly = assemble(lines)
+    except AsmError as e:
+        print("Error: {0}: {1}".format(listing_path.name, e), file=sys.stderr)
+        sys.exit(1)
+    data = assembly.data
+    elapsed = time.time() - t0
+
+    print("Assembled {0}: {1} bytes from {2} lines in {3:.3f}s".format(
+        listing_path.name, len(data), len(lines), elapsed))
+
+    errors, warnings = check_fallbacks(assembly)
+    if assembly.unresolved:
+        uses = sum(assembly.unresolved.values())
+        print("Undefined symbols taken from listing bytes: {0} ({1} uses)".format(
+            len(assembly.unresolved), uses))
+        for name in sorted(assembly.unresolved):
+            print("  {0} ({1})".format(name, assembly.unresolved[name]))
+        for error in errors:
+            print("INCONSISTENT: {0}".format(error))
+        for warning in warnings:
+            print("WARNING: {0}".format(warning))
+
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(data)
+        print("Wrote {0}".format(args.output))
+
+    status = 0
+    if args.binary:
+        bin_path = Path(args.binary)
+        if not bin_path.exists():
+            print("Error: file not found: {0}".format(bin_path), file=sys.stderr)
+            sys.exit(1)
+        with open(bin_path, "rb") as f:
+            binary = f.read()
+        diff = first_divergence(assembly, binary)
+        if diff is None and assembly.unresolved:
+            print("OK (unverified operands): listing reassembles to {0} ({1} bytes), "
+                  "but {2} operand(s) were copied from the listing's hex column "
+                  "and only cross-checked".format(
+                      bin_path.name, len(binary), sum(assembly.unresolved.values())))
+            status = 2
+        elif diff is None:
+            print("OK: listing reassembles to {0} ({1} bytes)".format(
+                bin_path.name, len(binary)))
+        else:
+            offset, addr, lineno, got, want = diff
+            if addr is None:
+                print("MISMATCH: listing ends at file offset ${0:04X}, binary has "
+                      "{1} bytes".format(offset, len(binary)))
+            else:
+                print("MISMATCH at ${0:04X} (file offset ${1:04X}, line {2}): "
+                      "assembled {3}, binary {4}".format(
+                          addr, offset, lineno,
+                          "${0:02X}".format(got) if got is not None else "--",
+                          "${0:02X}".format(want) if want is not None else "--"))
+            status = 1
+
+    if errors or (args.strict and assembly.unresolved):
+        status = 1
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
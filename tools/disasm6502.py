@@ -6,22 +6,32 @@ Cowritten by Claude Code Opus 4.6
 
 Features:
   - Control flow graph tracing (default) or linear disassembly (--linear)
-  - Self-modifying code (SMC) detection
+  - Self-modifying code (SMC) detection (stores, indexed/indirect stores, RMW)
   - Improved data region output (.BYTE, ASCII strings, pointer tables)
+  - Data table classification (HGR row tables, periodic/sine, monotonic,
+    sprite bitmaps) via a detector pipeline
   - Contextual label generation (sub_, jmp_, loc_, dat_)
   - Apple II hardware address annotation
   - Multiple entry point support (--entry)
+  - Lazy, page-cached listing windows for viewers (Disassembly, --window)
+  - Address-keyed analysis snapshots and structured diffs (--save-snapshot, --diff)
 
 Usage:
   python disasm6502.py <binary.bin> [load_address_hex]
   python disasm6502.py <binary.bin> [load_address_hex] --entry 0x0900 --entry 0x0A00
   python disasm6502.py <binary.bin> [load_address_hex] --linear
   python disasm6502.py <binary.bin> [load_address_hex] --no-smc
+  python disasm6502.py <binary.bin> [load_address_hex] --window 0x5875 --lines 60
+  python disasm6502.py <binary.bin> [load_address_hex] --save-snapshot old.json
+  python disasm6502.py <binary.bin> [load_address_hex] --diff old.json
 """
 
 import sys
 import argparse
-from collections import deque
+import hashlib
+import json
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -135,9 +145,27 @@ BRANCH_MNEMONICS = {"BCC", "BCS", "BEQ", "BMI", "BNE", "BPL", "BVC", "BVS"}
 # Store mnemonics for SMC detection
 STORE_MNEMONICS = {"STA", "STX", "STY"}
 
+# Read-modify-write mnemonics (also rewrite their memory operand)
+RMW_MNEMONICS = {"INC", "DEC", "ASL", "LSR", "ROL", "ROR"}
+
 # Addressing modes that target a definite absolute or zp address
 STORE_ABS_MODES = {"abs", "zp"}
 
+# Indexed modes: the write lands somewhere in base..base+index
+STORE_INDEXED_MODES = {"absx", "absy", "zpx", "zpy"}
+
+# Indirect modes: the write goes through a zero-page pointer
+STORE_INDIRECT_MODES = {"indx", "indy"}
+
+# Registers clobbered by each mnemonic (for the constant tracker used to
+# resolve indexed / indirect store targets)
+REG_WRITES = {
+    "LDA": "A", "PLA": "A", "TXA": "A", "TYA": "A", "ADC": "A", "SBC": "A",
+    "AND": "A", "ORA": "A", "EOR": "A",
+    "LDX": "X", "TAX": "X", "TSX": "X", "INX": "X", "DEX": "X",
+    "LDY": "Y", "TAY": "Y", "INY": "Y", "DEY": "Y",
+}
+
 # ---------------------------------------------------------------------------
 # Apple II hardware addresses
 # ---------------------------------------------------------------------------
@@ -223,9 +251,13 @@ class FlowTracer(object):
     classify every byte in the binary as CODE or DATA.
     """
 
-    def __init__(self, code, start_addr):
+    def __init__(self, code, start_addr, index_reach=0):
         self.code = code
         self.start_addr = start_addr
+        # Assumed reach of an index register whose value is unknown when
+        # sizing indexed writes: 0 treats tables as never straddling code,
+        # 255 is the conservative worst case.
+        self.index_reach = index_reach
         self.end_addr = start_addr + len(code)
         # Per-byte classification: 0 = DATA (default), 1 = CODE
         self.byte_type = [DATA] * len(code)
@@ -238,8 +270,16 @@ class FlowTracer(object):
         self.jmp_targets = set()        # jmp_XXXX
         self.branch_targets = set()     # loc_XXXX
         self.data_refs = set()          # dat_XXXX
-        # SMC: list of (writer_addr, target_addr)
+        # SMC: list of (writer_addr, first_target, last_target)
         self.smc_writes = []
+        # Indirect stores whose pointer could not be resolved: (writer, zp)
+        self.unresolved_writes = []
+        # Control-flow edges into each address (fall-through, branch,
+        # jump, call, return); entry points count one extra
+        self.predecessors = {}
+        # Addresses with more than one predecessor, where the constants
+        # tracked along one path no longer hold (set by trace())
+        self._joins = None
 
     # ----- helpers -----
 
@@ -268,15 +308,40 @@ class FlowTracer(object):
         """Queue an entry point for tracing."""
         if self._in_range(addr) and addr not in self._visited:
             self._work.append(addr)
+            self._edge(addr)
+
+    def _edge(self, target):
+        """Count one control-flow edge into *target* (first pass only)."""
+        if self._joins is None:
+            self.predecessors[target] = self.predecessors.get(target, 0) + 1
 
     def trace(self):
-        """Run the work-list algorithm until all reachable code is explored."""
+        """
+        Run the work-list algorithm until all reachable code is explored.
+
+        The first pass classifies code and counts predecessors. Join points
+        are only known once every edge has been seen, so store targets are
+        then collected again in a second pass that forgets the tracked
+        register and zero-page constants at each join; otherwise a loop's
+        indexed writes would be sized from its first iteration only.
+        """
+        entries = list(self._work)
         while self._work:
-            pc = self._work.popleft()
-            self._trace_block(pc)
+            self._trace_block(self._work.popleft())
+
+        self._joins = set(a for a, n in self.predecessors.items() if n > 1)
+        self.smc_writes = []
+        self.unresolved_writes = []
+        self._visited = set()
+        self._work = deque(entries)
+        while self._work:
+            self._trace_block(self._work.popleft())
 
     def _trace_block(self, pc):
         """Trace a single linear block of instructions."""
+        # Known register / zero-page constants within this block
+        regs = {}
+        zp_consts = {}
         while True:
             if pc in self._visited:
                 return
@@ -284,6 +349,9 @@ class FlowTracer(object):
                 return
 
             self._visited.add(pc)
+            if self._joins is not None and pc in self._joins:
+                regs.clear()
+                zp_consts.clear()
             off = self._offset(pc)
             opbyte = self.code[off]
 
@@ -318,23 +386,31 @@ class FlowTracer(object):
                     branch_offset = operand
                 target = pc + 2 + branch_offset
                 self.branch_targets.add(target)
+                self._edge(target)
                 if self._in_range(target) and target not in self._visited:
                     self._work.append(target)
                 # Fall through
                 pc = pc + size
+                self._edge(pc)
                 continue
 
             if mnem == "JSR" and mode == "abs":
                 self.jsr_targets.add(operand)
+                self._edge(operand)
                 if self._in_range(operand) and operand not in self._visited:
                     self._work.append(operand)
+                # The callee may clobber anything we were tracking
+                regs.clear()
+                zp_consts.clear()
                 # Fall through after JSR
                 pc = pc + size
+                self._edge(pc)
                 continue
 
             if mnem == "JMP":
                 if mode == "abs":
                     self.jmp_targets.add(operand)
+                    self._edge(operand)
                     if self._in_range(operand) and operand not in self._visited:
                         self._work.append(operand)
                 # JMP (indirect) -- we cannot resolve the target statically
@@ -345,36 +421,159 @@ class FlowTracer(object):
                 return
 
             # ---- Track store targets for SMC detection ----
-            if mnem in STORE_MNEMONICS and mode in STORE_ABS_MODES and operand is not None:
-                if self._in_range(operand):
-                    self.data_refs.add(operand)
+            if (mnem in STORE_MNEMONICS or mnem in RMW_MNEMONICS) and operand is not None:
+                span = self._write_span(mode, operand, regs, zp_consts,
+                                        self.index_reach)
+                if span is None:
+                    if mode in STORE_INDIRECT_MODES:
+                        self.unresolved_writes.append((pc, operand))
+                elif self._in_range(span[0]) or self._in_range(span[1]):
+                    if mode in STORE_ABS_MODES:
+                        self.data_refs.add(operand)
                     # We record the write; SMC check happens after full trace
-                    self.smc_writes.append((pc, operand))
+                    self.smc_writes.append((pc, span[0], span[1]))
+
+            self._track_constants(mnem, mode, operand, regs, zp_consts)
 
             # ---- Track data references (loads from binary range) ----
             if mnem in ("LDA", "LDX", "LDY", "CMP", "CPX", "CPY",
                         "ADC", "SBC", "AND", "ORA", "EOR", "BIT",
                         "INC", "DEC", "ASL", "LSR", "ROL", "ROR"):
-                if mode in ("abs",) and operand is not None:
+                # Indexed loads name the base of a table
+                if mode in ("abs", "absx", "absy") and operand is not None:
                     if self._in_range(operand):
                         self.data_refs.add(operand)
 
             pc = pc + size
+            self._edge(pc)
+
+    @staticmethod
+    def _track_constants(mnem, mode, operand, regs, zp_consts):
+        """Update the per-block register and zero-page constant tables."""
+        if mode == "imm" and mnem in ("LDA", "LDX", "LDY"):
+            regs[mnem[2]] = operand
+            return
+        if mnem in STORE_MNEMONICS and mode == "zp":
+            val = regs.get(mnem[2])
+            if val is None:
+                zp_consts.pop(operand, None)
+            else:
+                zp_consts[operand] = val
+            return
+        if mnem in RMW_MNEMONICS and mode in ("zp", "zpx"):
+            zp_consts.pop(operand, None)
+            if mode == "zpx":
+                zp_consts.clear()
+        elif mnem in STORE_MNEMONICS and mode in ("zpx", "zpy", "indx"):
+            zp_consts.clear()
+        if mnem in ("INX", "DEX", "INY", "DEY") and mnem[2] in regs:
+            step = 1 if mnem[0] == "I" else -1
+            regs[mnem[2]] = (regs[mnem[2]] + step) & 0xFF
+        elif mnem in REG_WRITES:
+            regs.pop(REG_WRITES[mnem], None)
+        elif mnem in RMW_MNEMONICS and mode == "acc":
+            regs.pop("A", None)
+
+    @staticmethod
+    def _write_span(mode, operand, regs, zp_consts, index_reach=0):
+        """
+        Return (first, last) addresses a store/RMW may write, or None when
+        the target is unknowable.  Indexed writes cover base..base+index,
+        using the index register value when it is a known constant and
+        *index_reach* otherwise.
+        """
+        if mode in STORE_ABS_MODES:
+            return operand, operand
+        if mode in STORE_INDEXED_MODES:
+            reach = regs.get("X" if mode.endswith("x") else "Y", index_reach)
+            if mode in ("zpx", "zpy"):
+                return operand, min(operand + reach, 0xFF)
+            return operand, min(operand + reach, 0xFFFF)
+        if mode == "indy":
+            lo = zp_consts.get(operand)
+            hi = zp_consts.get((operand + 1) & 0xFF)
+            if lo is None or hi is None:
+                return None
+            base = lo | (hi << 8)
+            return base, min(base + regs.get("Y", index_reach), 0xFFFF)
+        if mode == "indx":
+            x = regs.get("X")
+            if x is None:
+                return None
+            ptr = (operand + x) & 0xFF
+            lo = zp_consts.get(ptr)
+            hi = zp_consts.get((ptr + 1) & 0xFF)
+            if lo is None or hi is None:
+                return None
+            base = lo | (hi << 8)
+            return base, base
+        return None
+
+    def code_spans(self):
+        """Return a SpanIndex over the contiguous runs of CODE bytes."""
+        return SpanIndex.from_runs(self.byte_type, CODE, self.start_addr)
 
     def detect_smc(self):
         """
-        After tracing, check each store-to-binary-range to see if it
-        writes to an address currently classified as CODE.
-        Returns list of (writer_addr, target_addr).
+        After tracing, check each store/RMW into the binary range to see
+        if any byte it may write is currently classified as CODE.
+        Returns list of (writer_addr, target_addr) where target_addr is
+        the first code byte inside the written span.
         """
+        spans = self.code_spans()
         results = []
-        for writer_addr, target_addr in self.smc_writes:
-            off = self._offset(target_addr)
-            if 0 <= off < len(self.byte_type) and self.byte_type[off] == CODE:
-                results.append((writer_addr, target_addr))
+        for writer_addr, first, last in self.smc_writes:
+            hit = spans.first_hit(first, last)
+            if hit is not None:
+                results.append((writer_addr, hit))
         return results
 
 
+class SpanIndex(object):
+    """
+    Sorted, non-overlapping address intervals with O(log n) hit tests.
+    """
+
+    def __init__(self, starts, ends):
+        self.starts = starts    # first address of each span
+        self.ends = ends        # last address of each span (inclusive)
+
+    @classmethod
+    def from_runs(cls, byte_type, kind, base_addr):
+        """Build an index over the runs of *kind* in a classification list."""
+        starts = []
+        ends = []
+        i = 0
+        n = len(byte_type)
+        while i < n:
+            if byte_type[i] != kind:
+                i += 1
+                continue
+            start = i
+            while i < n and byte_type[i] == kind:
+                i += 1
+            starts.append(base_addr + start)
+            ends.append(base_addr + i - 1)
+        return cls(starts, ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def find(self, addr):
+        """Return the index of the span containing *addr*, or None."""
+        idx = bisect_right(self.starts, addr) - 1
+        if idx >= 0 and addr <= self.ends[idx]:
+            return idx
+        return None
+
+    def first_hit(self, first, last):
+        """Return the lowest address in first..last covered by a span, or None."""
+        idx = bisect_left(self.ends, first)
+        if idx < len(self.starts) and self.starts[idx] <= last:
+            return max(first, self.starts[idx])
+        return None
+
+
 # ===================================================================
 #  Linear scanner (legacy mode, improved)
 # ===================================================================
@@ -518,6 +717,16 @@ def _is_printable(b, allow_high_bit):
         ch = b
     return 0x20 <= ch <= 0x7E
 
+def _is_string_byte(b, high_bit):
+    """
+    Check if a byte can be emitted inside an .ASC string without losing
+    information: every byte of a high-bit string must have bit 7 set,
+    and the quote character cannot appear unescaped.
+    """
+    if high_bit != bool(b & 0x80):
+        return False
+    return _is_printable(b, high_bit) and (b & 0x7F) != 0x22
+
 def find_strings_in_region(code, region_start_off, region_len, min_len=4):
     """
     Find ASCII string runs within a data region.
@@ -530,10 +739,10 @@ def find_strings_in_region(code, region_start_off, region_len, min_len=4):
     for high_bit in (True, False):
         i = region_start_off
         while i < end:
-            if _is_printable(code[i], high_bit):
+            if _is_string_byte(code[i], high_bit):
                 start = i
                 chars = []
-                while i < end and _is_printable(code[i], high_bit):
+                while i < end and _is_string_byte(code[i], high_bit):
                     ch = code[i] & 0x7F if high_bit else code[i]
                     chars.append(chr(ch))
                     i += 1
@@ -593,10 +802,303 @@ def detect_pointer_table(code, region_start_off, region_len, start_addr, end_add
     return results
 
 
+# ===================================================================
+#  Data region classification
+# ===================================================================
+
+def _hgr_row_address(y):
+    """Base address of HGR page 1 scan line *y* (3-level interleave)."""
+    return 0x2000 + (y & 7) * 0x400 + ((y >> 3) & 7) * 0x80 + (y >> 6) * 0x28
+
+HGR_ROWS = [_hgr_row_address(y) for y in range(192)]
+HGR_ROW_LO = bytes(a & 0xFF for a in HGR_ROWS)
+HGR_ROW_HI = bytes(a >> 8 for a in HGR_ROWS)
+
+# Minimum score for a detector to claim a block
+DATA_CLASS_THRESHOLD = 0.5
+
+
+class BlockStats(object):
+    """
+    Per-block arrays shared by every detector, computed in one pass over
+    the block so detectors never re-walk the bytes.
+    """
+
+    def __init__(self, block, tail=None):
+        self.block = block
+        # Bytes to the end of the region; detectors for tables that are
+        # known to run across spurious labels may claim into this
+        self.tail = block if tail is None else tail
+        self.diffs = [b - a for a, b in zip(block, block[1:])]
+        self.lo = min(block) if block else 0
+        self.hi = max(block) if block else 0
+
+    def run_length(self, predicate, limit=None):
+        """
+        Length of the leading run of diffs satisfying *predicate*, in bytes.
+        With *limit*, the run is followed into the tail for up to *limit*
+        bytes.
+        """
+        if limit is None:
+            diffs = self.diffs
+        else:
+            body = self.tail[:limit]
+            diffs = (b - a for a, b in zip(body, body[1:]))
+        n = 0
+        for d in diffs:
+            if not predicate(d):
+                break
+            n += 1
+        return n + 1 if self.block else 0
+
+
+def detect_hgr_line_table(stats):
+    """HGR row-address low or high byte table (16+ consecutive rows)."""
+    block = stats.tail
+    if len(block) < 16:
+        return None
+    best = None
+    for part, table in (("lo", HGR_ROW_LO), ("hi", HGR_ROW_HI)):
+        row = table.find(block[:8])
+        while row >= 0:
+            n = 8
+            while row + n < 192 and n < len(block) and block[n] == table[row + n]:
+                n += 1
+            if n >= 16 and (best is None or n > best[1]):
+                desc = "HGR row address {0} bytes, rows {1}-{2}".format(
+                    part, row, row + n - 1)
+                best = (1.0, n, desc, ("hgr_" + part, row))
+            row = table.find(block[:8], row + 1)
+    return best
+
+
+# Longest table one index register can walk
+TABLE_MAX_ENTRIES = 256
+
+
+def detect_periodic_table(stats):
+    """
+    Smooth table with turning points (sine/cosine style lookup).  The
+    smooth run is followed across labels (code indexing into the middle
+    of the table leaves spurious ones), up to one page of entries.
+    """
+    block = stats.block
+    if len(block) < 32:
+        return None
+    span = stats.hi - stats.lo
+    if span < 16:
+        return None
+    step = max(2, span // 8)
+    n = stats.run_length(lambda d: -step <= d <= step, TABLE_MAX_ENTRIES)
+    if n < 32:
+        return None
+    body = stats.tail[:n]
+    turns = []
+    sign = 0
+    for i, d in enumerate(b - a for a, b in zip(body, body[1:])):
+        if d:
+            new_sign = 1 if d > 0 else -1
+            if sign and new_sign != sign:
+                turns.append(i)
+            sign = new_sign
+    if not turns:
+        return None
+    desc = "periodic table: {0} entries, range ${1:02X}-${2:02X}".format(
+        n, min(body), max(body))
+    if len(turns) >= 2:
+        period = 2.0 * (turns[-1] - turns[0]) / (len(turns) - 1)
+        desc += ", period ~{0:.0f}".format(period)
+    return (0.9 if n >= len(block) else 0.75, n, desc, ("periodic",))
+
+
+# Shortest run reported as a monotonic table; shorter runs are mostly
+# bit masks ($01, $02, $04 ...) and column offsets
+MONOTONIC_MIN_ENTRIES = 8
+
+
+def detect_monotonic_table(stats):
+    """
+    Non-decreasing or non-increasing run (difficulty / threshold tables).
+    The run ends at the first step more than three times the median step,
+    so a table is not stretched over the opcode that follows it.
+    """
+    up = stats.run_length(lambda d: d >= 0)
+    down = stats.run_length(lambda d: d <= 0)
+    n = max(up, down)
+    steps = sorted(abs(d) for d in stats.diffs[:n - 1])
+    if not steps:
+        return None
+    bound = max(2, 3 * steps[len(steps) // 2])
+    for i, d in enumerate(stats.diffs[:n - 1]):
+        if abs(d) > bound:
+            n = i + 1
+            break
+    body = stats.block[:n]
+    if n < MONOTONIC_MIN_ENTRIES or len(set(body)) < 4:
+        return None
+    if all(b and not b & (b - 1) for b in body):
+        return None     # single-bit masks, not a table of levels
+    direction = "increasing" if up >= down else "decreasing"
+    desc = "monotonic {0} table: {1} entries, ${2:02X}..${3:02X}".format(
+        direction, n, body[0], body[-1])
+    deltas = set(stats.diffs[:n - 1])
+    if len(deltas) == 1:
+        desc += " (step {0})".format(deltas.pop())
+    return (0.65 if n == len(stats.block) else 0.6, n, desc, ("monotonic",))
+
+
+def _leading_instructions(block):
+    """Number of valid, non-BRK instructions decoded from the start of *block*."""
+    i = n = 0
+    while i < len(block):
+        op = block[i]
+        if not op or op not in OPCODES:
+            break
+        i += OPCODES[op][2]
+        n += 1
+    return n
+
+
+def _row_coherence(block):
+    """
+    Best (agreement, width) over candidate sprite widths 2-8: the fraction
+    of non-blank byte pairs one row apart that differ in at most one pixel.
+    Sprite rows change little from one scan line to the next; code and
+    text bytes do not line up at any fixed stride.
+    """
+    best = (0.0, 0)
+    for width in range(2, 9):
+        pairs = agree = 0
+        for a, b in zip(block, block[width:]):
+            if not (a | b) & 0x7F:
+                continue
+            pairs += 1
+            if bin((a ^ b) & 0x7F).count("1") <= 1:
+                agree += 1
+        if pairs >= 8 and float(agree) / pairs > best[0]:
+            best = (float(agree) / pairs, width)
+    return best
+
+
+# Weakest evidence accepted as sprite rows, and the score of such claims.
+# The score sits below STRONG_CLAIM so strings and pointer tables win
+# any overlap with a bitmap claim.
+BITMAP_COHERENCE = 0.6
+BITMAP_SCORE = 0.55
+# Typed claims scoring below this only fill gaps left by strings/pointers;
+# every other typed table keeps strings and pointers out of its range
+STRONG_CLAIM = 0.6
+
+
+def detect_sprite_bitmap(stats):
+    """Sparse bitmap rows: blanks, few values, rows that line up at a width."""
+    block = stats.block
+    if len(block) < 16:
+        return None
+    blank = sum(1 for b in block if not b & 0x7F)
+    ratio = float(blank) / len(block)
+    distinct = len(set(b & 0x7F for b in block))
+    if not 0.2 <= ratio <= 0.9 or distinct < 4 or distinct > len(block) // 2:
+        return None
+    # Anything that opens with a run of instructions is more likely code
+    # the tracer did not reach (relocated routines, unreferenced entries)
+    if _leading_instructions(block) >= 4:
+        return None
+    coherence, width = _row_coherence(block)
+    if coherence < BITMAP_COHERENCE:
+        return None
+    desc = "sprite bitmap data: {0} bytes, {1:.0%} blank, rows of {2}".format(
+        len(block), ratio, width)
+    return (BITMAP_SCORE, len(block), desc, ("bitmap", width))
+
+
+# Detector pipeline: each takes BlockStats and returns
+# (score, claimed_length, description, directive_style) or None.
+# Append to this list to plug in new detectors.
+DATA_DETECTORS = [
+    detect_hgr_line_table,
+    detect_periodic_table,
+    detect_monotonic_table,
+    detect_sprite_bitmap,
+]
+
+
+def classify_block(block, detectors=None, tail=None):
+    """Score *block* against every detector; return the best claim or None."""
+    stats = BlockStats(block, tail)
+    best = None
+    for detector in (DATA_DETECTORS if detectors is None else detectors):
+        claim = detector(stats)
+        if claim and claim[0] >= DATA_CLASS_THRESHOLD and (
+                best is None or claim[0] > best[0]):
+            best = claim
+    return best
+
+
+def classify_data_region(code, start_off, length, base_addr, labels):
+    """
+    Split a data region at its labels and classify each block.
+    Returns list of (offset_within_region, length, score, description, style).
+    A detector may claim only a prefix; the remainder is classified again.
+    """
+    cuts = [0]
+    for i in range(1, length):
+        if (base_addr + start_off + i) in labels:
+            cuts.append(i)
+    cuts.append(length)
+
+    results = []
+    claimed = 0
+    for block_start, block_end in zip(cuts, cuts[1:]):
+        pos = max(block_start, claimed)
+        while block_end - pos >= 6:
+            claim = classify_block(code[start_off + pos:start_off + block_end],
+                                   tail=code[start_off + pos:start_off + length])
+            if claim is None:
+                break
+            score, n, desc, style = claim
+            results.append((pos, n, score, desc, style))
+            pos += n
+        claimed = max(claimed, pos)
+    return results
+
+
 # ===================================================================
 #  Data region emitter
 # ===================================================================
 
+def _emit_typed_bytes(code, start_off, i, n, base_addr, labels, style):
+    """
+    Emit the .BYTE lines of a classified table.  HGR row tables are
+    written as <$xxxx / >$xxxx row addresses; everything else as hex,
+    breaking lines at labels as usual.
+    """
+    lines = []
+    per_line = 8 if style[0].startswith("hgr_") else 16
+    pos = i
+    while pos < i + n:
+        addr = base_addr + start_off + pos
+        if pos != i:
+            lbl = labels.get(addr)
+            if lbl:
+                lines.append("{0}:".format(lbl))
+        end = pos + 1
+        while end < i + n and end - pos < per_line and not labels.get(
+                base_addr + start_off + end):
+            end += 1
+        if style[0].startswith("hgr_"):
+            prefix = "<" if style[0] == "hgr_lo" else ">"
+            row = style[1] + pos - i
+            vals = ", ".join("{0}${1:04X}".format(prefix, HGR_ROWS[r])
+                             for r in range(row, row + end - pos))
+        else:
+            vals = ", ".join("${0:02X}".format(b)
+                             for b in code[start_off + pos:start_off + end])
+        lines.append("    ${0:04X}:             .BYTE {1}".format(addr, vals))
+        pos = end
+    return lines
+
+
 def emit_data_region(code, start_off, length, base_addr, labels, bin_start, bin_end):
     """
     Emit .BYTE / .ASC / .WORD lines for a data region.
@@ -605,19 +1107,38 @@ def emit_data_region(code, start_off, length, base_addr, labels, bin_start, bin_
     lines = []
     region_addr = base_addr + start_off
 
+    # Strong typed tables first, then strings and pointers; weak typed
+    # claims (sprite bitmaps) only fill the gaps left
+    typed = classify_data_region(code, start_off, length, base_addr, labels)
     # Detect strings
     str_runs = find_strings_in_region(code, start_off, length)
     # Detect pointer tables
     ptr_tables = detect_pointer_table(code, start_off, length, bin_start, bin_end)
 
     # Build a set of offsets covered by special regions
-    special = {}  # offset_within_region -> ("str", ...) or ("ptr", ...)
+    special = {}  # offset_within_region -> ("typed", ...), ("str", ...) or ("ptr", ...)
+    for off, n, score, desc, style in typed:
+        if score < STRONG_CLAIM:
+            continue
+        for k in range(n):
+            special[off + k] = ("typed", off, n, desc, style)
     for off, text, hb in str_runs:
+        if any(off + k in special for k in range(len(text))):
+            continue
         for k in range(len(text)):
             special[off + k] = ("str", off, text, hb)
     for off, ptrs in ptr_tables:
+        # Pointer tables take precedence over strings, as before typing
+        if any(special.get(off + k, ("str",))[0] != "str"
+               for k in range(len(ptrs) * 2)):
+            continue
         for k in range(len(ptrs) * 2):
             special[off + k] = ("ptr", off, ptrs)
+    for off, n, score, desc, style in typed:
+        if score >= STRONG_CLAIM or any(off + k in special for k in range(n)):
+            continue
+        for k in range(n):
+            special[off + k] = ("typed", off, n, desc, style)
 
     i = 0
     while i < length:
@@ -630,6 +1151,13 @@ def emit_data_region(code, start_off, length, base_addr, labels, bin_start, bin_
 
         if i in special:
             tag = special[i]
+            if tag[0] == "typed" and tag[1] == i:
+                _, _, n, desc, style = tag
+                lines.append("    ; --- {0} ---".format(desc))
+                lines.extend(_emit_typed_bytes(code, start_off, i, n, base_addr,
+                                               labels, style))
+                i += n
+                continue
             if tag[0] == "str" and tag[1] == i:
                 _, _, text, hb = tag
                 hb_marker = " (high-bit)" if hb else ""
@@ -676,93 +1204,76 @@ def emit_data_region(code, start_off, length, base_addr, labels, bin_start, bin_
 #  Main disassembly output
 # ===================================================================
 
-def disassemble_with_cfg(code, start_addr, byte_type, labels, smc_set):
+def _format_code_line(code, i, pc, labels, smc_writers, smc_targets):
     """
-    Produce final disassembly lines using the byte classification from
-    the flow tracer.  CODE bytes are disassembled; DATA bytes are emitted
-    as .BYTE / .ASC etc.
-
-    smc_set: set of (writer_addr, target_addr) for SMC annotation.
+    Format the instruction at offset *i* (address *pc*).
+    Returns (lines, size) where *lines* includes any label lines.
     """
     lines = []
-    end_addr = start_addr + len(code)
-    smc_writers = {}   # writer_addr -> target_addr
-    smc_targets = set()
-    for w, t in smc_set:
-        smc_writers[w] = t
-        smc_targets.add(t)
-
-    i = 0
-    while i < len(code):
-        pc = start_addr + i
-
-        if byte_type[i] == DATA:
-            # Gather contiguous DATA region
-            data_start = i
-            while i < len(code) and byte_type[i] == DATA:
-                i += 1
-            data_len = i - data_start
-            data_lines = emit_data_region(
-                code, data_start, data_len, start_addr, labels,
-                start_addr, end_addr)
-            lines.extend(data_lines)
-            continue
-
-        # CODE byte
-        # Label?
-        lbl = labels.get(pc)
-        if lbl:
-            lines.append("")
-            lines.append("{0}:".format(lbl))
-
-        opbyte = code[i]
-        if opbyte not in OPCODES:
-            # Should not happen if tracer is correct, but handle gracefully
-            lines.append("    ${0:04X}: {1:02X}          .BYTE ${1:02X}  ; unreachable?".format(pc, opbyte))
-            i += 1
-            continue
-
-        mnem, mode, size = OPCODES[opbyte]
-
-        # Build hex byte string
-        if size == 1:
-            operand = None
-            hex_bytes = "{0:02X}".format(opbyte)
-        elif size == 2:
-            if i + 1 < len(code):
-                operand = code[i + 1]
-                hex_bytes = "{0:02X} {1:02X}".format(opbyte, operand)
-            else:
-                operand = 0
-                hex_bytes = "{0:02X} ??".format(opbyte)
+    lbl = labels.get(pc)
+    if lbl:
+        lines.append("")
+        lines.append("{0}:".format(lbl))
+
+    opbyte = code[i]
+    if opbyte not in OPCODES:
+        # Should not happen if tracer is correct, but handle gracefully
+        lines.append("    ${0:04X}: {1:02X}          .BYTE ${1:02X}  ; unreachable?".format(pc, opbyte))
+        return lines, 1
+
+    mnem, mode, size = OPCODES[opbyte]
+
+    # Build hex byte string
+    if size == 1:
+        operand = None
+        hex_bytes = "{0:02X}".format(opbyte)
+    elif size == 2:
+        if i + 1 < len(code):
+            operand = code[i + 1]
+            hex_bytes = "{0:02X} {1:02X}".format(opbyte, operand)
         else:
-            if i + 2 < len(code):
-                operand = code[i + 1] | (code[i + 2] << 8)
-                hex_bytes = "{0:02X} {1:02X} {2:02X}".format(opbyte, code[i + 1], code[i + 2])
-            else:
-                operand = 0
-                hex_bytes = "{0:02X} ?? ??".format(opbyte)
-
-        if operand is not None:
-            operand_str = format_operand(mode, operand, pc, labels)
+            operand = 0
+            hex_bytes = "{0:02X} ??".format(opbyte)
+    else:
+        if i + 2 < len(code):
+            operand = code[i + 1] | (code[i + 2] << 8)
+            hex_bytes = "{0:02X} {1:02X} {2:02X}".format(opbyte, code[i + 1], code[i + 2])
         else:
-            operand_str = ""
+            operand = 0
+            hex_bytes = "{0:02X} ?? ??".format(opbyte)
 
-        # SMC annotation for the writer instruction
-        smc_comment = ""
-        if pc in smc_writers:
-            smc_comment = "  ; !!! SELF-MODIFYING: writes to code at ${0:04X}".format(
-                smc_writers[pc])
+    if operand is not None:
+        operand_str = format_operand(mode, operand, pc, labels)
+    else:
+        operand_str = ""
+
+    # SMC annotation for the writer instruction
+    smc_comment = ""
+    if pc in smc_writers:
+        smc_comment = "  ; !!! SELF-MODIFYING: writes to code at ${0:04X}".format(
+            smc_writers[pc])
+
+    # SMC annotation for the target (the byte being overwritten)
+    if pc in smc_targets:
+        smc_comment += "  ; !!! SMC TARGET: modified at runtime"
 
-        # SMC annotation for the target (the byte being overwritten)
-        if pc in smc_targets:
-            smc_comment += "  ; !!! SMC TARGET: modified at runtime"
+    lines.append("    ${0:04X}: {1:10s}  {2:4s} {3}{4}".format(
+        pc, hex_bytes, mnem, operand_str, smc_comment))
+    return lines, size
 
-        lines.append("    ${0:04X}: {1:10s}  {2:4s} {3}{4}".format(
-            pc, hex_bytes, mnem, operand_str, smc_comment))
 
-        i += size
+def disassemble_with_cfg(code, start_addr, byte_type, labels, smc_set):
+    """
+    Produce final disassembly lines using the byte classification from
+    the flow tracer.  CODE bytes are disassembled; DATA bytes are emitted
+    as .BYTE / .ASC etc.
 
+    smc_set: set of (writer_addr, target_addr) for SMC annotation.
+    """
+    listing = Disassembly(code, start_addr, byte_type, labels, smc_set)
+    lines = []
+    for idx in range(len(listing.pages)):
+        lines.extend(listing.render_page(idx))
     return lines
 
 
@@ -827,6 +1338,447 @@ def disassemble_linear(code, start_addr, labels, smc_set):
     return lines
 
 
+# ===================================================================
+#  Lazy disassembly (random-access viewers)
+# ===================================================================
+
+def build_page_index(code, byte_type, page_size=256):
+    """
+    Split the CFG classification into independently formattable pages.
+    Returns a sorted list of (start_off, end_off, kind) with end exclusive.
+
+    Each contiguous DATA run is one page (strings and pointer tables may
+    span the whole run).  CODE runs are cut at instruction boundaries
+    every *page_size* bytes, following the same walk as the full listing
+    so that concatenated pages reproduce it exactly.
+    """
+    pages = []
+    n = len(code)
+    i = 0
+    while i < n:
+        if byte_type[i] == DATA:
+            start = i
+            while i < n and byte_type[i] == DATA:
+                i += 1
+            pages.append((start, i, DATA))
+            continue
+
+        start = i
+        while i < n and byte_type[i] == CODE and i - start < page_size:
+            opbyte = code[i]
+            i += OPCODES[opbyte][2] if opbyte in OPCODES else 1
+        pages.append((start, min(i, n), CODE))
+    return pages
+
+
+class Disassembly(object):
+    """
+    Random-access view of a CFG disassembly.
+
+    Lines are only formatted for the pages a caller asks for; formatted
+    pages are kept in a small LRU cache.  Addresses map to pages through
+    the page index with a binary search, and window() works from that
+    page forward, so jumping to any address of a 64 KB image renders only
+    the pages the window covers.  Absolute line numbers (line_of, lines,
+    len) need the line counts of every earlier page; those are counted
+    once and kept, without keeping the formatted pages.
+    """
+
+    PAGE_SIZE = 256
+
+    def __init__(self, code, start_addr, byte_type, labels, smc_set,
+                 cache_pages=64):
+        self.code = code
+        self.start_addr = start_addr
+        self.end_addr = start_addr + len(code)
+        self.byte_type = byte_type
+        self.labels = labels
+        self.smc_writers = {}
+        self.smc_targets = set()
+        for w, t in smc_set:
+            self.smc_writers[w] = t
+            self.smc_targets.add(t)
+
+        self.pages = build_page_index(code, byte_type, self.PAGE_SIZE)
+        self._page_starts = [p[0] for p in self.pages]
+        # Line counts survive cache eviction; prefix sums grow on demand
+        self._line_counts = [None] * len(self.pages)
+        self._line_starts = [0]
+        self._cache = OrderedDict()
+        self._cache_pages = cache_pages
+
+    # ----- page rendering -----
+
+    def render_page(self, idx):
+        """Format page *idx* without touching the cache."""
+        start, end, kind = self.pages[idx]
+        if kind == DATA:
+            return emit_data_region(
+                self.code, start, end - start, self.start_addr, self.labels,
+                self.start_addr, self.end_addr)
+
+        lines = []
+        i = start
+        while i < end:
+            pc = self.start_addr + i
+            instr_lines, size = _format_code_line(
+                self.code, i, pc, self.labels,
+                self.smc_writers, self.smc_targets)
+            lines.extend(instr_lines)
+            i += size
+        return lines
+
+    def page_lines(self, idx):
+        """Return the formatted lines of page *idx* (LRU cached)."""
+        lines = self._cache.get(idx)
+        if lines is not None:
+            self._cache.move_to_end(idx)
+            return lines
+        lines = self.render_page(idx)
+        self._cache[idx] = lines
+        self._line_counts[idx] = len(lines)
+        if len(self._cache) > self._cache_pages:
+            self._cache.popitem(last=False)
+        return lines
+
+    def _page_line_count(self, idx):
+        """Number of lines on page *idx*, counted without formatting code."""
+        count = self._line_counts[idx]
+        if count is not None:
+            return count
+        start, end, kind = self.pages[idx]
+        if kind == DATA:
+            # Format to count, but do not evict viewer pages for it
+            lines = self._cache.get(idx)
+            count = len(lines if lines is not None else self.render_page(idx))
+        else:
+            count = 0
+            i = start
+            while i < end:
+                if (self.start_addr + i) in self.labels:
+                    count += 2
+                count += 1
+                opbyte = self.code[i]
+                i += OPCODES[opbyte][2] if opbyte in OPCODES else 1
+        self._line_counts[idx] = count
+        return count
+
+    def _line_start(self, idx):
+        """Index of the first line of page *idx* in the full listing."""
+        while len(self._line_starts) <= idx:
+            prev = len(self._line_starts) - 1
+            self._line_starts.append(
+                self._line_starts[prev] + self._page_line_count(prev))
+        return self._line_starts[idx]
+
+    def _line_in_page(self, idx, addr):
+        """
+        Offset within page *idx* of the line at which *addr* is emitted:
+        the instruction or data directive covering it, or the label lines
+        that introduce it.
+        """
+        best = 0
+        block = None    # first blank/label line before the next directive
+        for k, line in enumerate(self.page_lines(idx)):
+            if not line.startswith("    $"):
+                if block is None:
+                    block = k
+                continue
+            if int(line[5:9], 16) > addr:
+                break
+            best = k if block is None else block
+            block = None
+        return best
+
+    def _page_lines_from(self, idx, skip, count):
+        """Up to *count* lines from line *skip* of page *idx* onwards."""
+        result = []
+        while idx < len(self.pages) and len(result) < count:
+            page = self.page_lines(idx)
+            result.extend(page[skip:skip + count - len(result)])
+            skip = 0
+            idx += 1
+        return result
+
+    # ----- public API -----
+
+    def page_of(self, addr):
+        """Return the page index containing *addr*, or None."""
+        off = addr - self.start_addr
+        if not 0 <= off < len(self.code):
+            return None
+        return bisect_right(self._page_starts, off) - 1
+
+    def line_of(self, addr):
+        """
+        Return the listing line index at which *addr* is emitted: the
+        instruction or data directive covering it, or the label lines
+        that introduce it.
+        """
+        idx = self.page_of(addr)
+        if idx is None:
+            return None
+        return self._line_start(idx) + self._line_in_page(idx, addr)
+
+    def lines(self, first, count):
+        """Return up to *count* listing lines starting at line index *first*."""
+        if count <= 0 or first < 0:
+            return []
+        # Extend the prefix sums just past *first*, then bisect them
+        while (len(self._line_starts) <= len(self.pages)
+               and self._line_starts[-1] <= first):
+            self._line_start(len(self._line_starts))
+        idx = bisect_right(self._line_starts, first) - 1
+        if idx >= len(self.pages):
+            return []
+        return self._page_lines_from(idx, first - self._line_starts[idx], count)
+
+    def window(self, addr, count):
+        """
+        Return *count* listing lines starting at the line covering *addr*.
+        Only the page of *addr* and the pages after it that the window
+        reaches are rendered.
+        """
+        idx = self.page_of(addr)
+        if idx is None or count <= 0:
+            return []
+        return self._page_lines_from(idx, self._line_in_page(idx, addr), count)
+
+    def __len__(self):
+        return self._line_start(len(self.pages))
+
+
+# ===================================================================
+#  Analysis snapshots and structured diffs
+# ===================================================================
+
+SNAPSHOT_VERSION = 1
+
+
+def _region_digest(start, end, kind, tables):
+    """
+    Digest of everything a snapshot records inside one region.
+    tables is a list of (sorted addresses, addr -> value) pairs; the
+    region's entries are sliced out of each address list with bisect.
+    """
+    h = hashlib.sha1("{0}:{1}:{2}".format(start, end, kind).encode())
+    for keys, table in tables:
+        for a in keys[bisect_left(keys, start):bisect_right(keys, end)]:
+            h.update("|{0}={1}".format(a, table[a]).encode("utf-8"))
+        h.update(b"#")
+    return h.hexdigest()[:16]
+
+
+def build_snapshot(regions, labels, comments):
+    """
+    Build an address-keyed analysis snapshot.
+
+    regions:  sorted list of (start, end_inclusive, kind) covering the listing
+    labels:   addr -> label name
+    comments: addr -> comment text
+
+    Each region carries a digest of the labels and comments inside it so
+    that diff_snapshots() can skip unchanged regions without looking at
+    their contents.  Entries outside every region (e.g. labels on ROM
+    routines) are kept separately as "external".
+    """
+    spans = SpanIndex([r[0] for r in regions], [r[1] for r in regions])
+    tables = [(sorted(labels), labels), (sorted(comments), comments)]
+    snap_regions = []
+    for start, end, kind in regions:
+        snap_regions.append([start, end, kind,
+                             _region_digest(start, end, kind, tables)])
+    external = {}
+    for name, table in (("labels", labels), ("comments", comments)):
+        external[name] = sorted([a, v] for a, v in table.items()
+                                if spans.find(a) is None)
+    return {
+        "version": SNAPSHOT_VERSION,
+        "regions": snap_regions,
+        "labels": sorted([a, v] for a, v in labels.items()),
+        "comments": sorted([a, v] for a, v in comments.items()),
+        "external": external,
+    }
+
+
+def snapshot_from_analysis(start_addr, byte_type, labels, smc_results):
+    """Snapshot a flow-traced disassembly (regions, labels, SMC comments)."""
+    regions = []
+    for kind, name in ((CODE, "code"), (DATA, "data")):
+        spans = SpanIndex.from_runs(byte_type, kind, start_addr)
+        regions.extend(zip(spans.starts, spans.ends, [name] * len(spans)))
+    regions.sort()
+    comments = {}
+    for writer, target in smc_results:
+        comments[writer] = "SELF-MODIFYING: writes to code at ${0:04X}".format(target)
+        comments.setdefault(target, "SMC TARGET: modified at runtime")
+    return build_snapshot(regions, labels, comments)
+
+
+def save_snapshot(path, snap):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snap, f, indent=0)
+
+
+def load_snapshot(path):
+    with open(path, "r", encoding="utf-8") as f:
+        snap = json.load(f)
+    if snap.get("version") != SNAPSHOT_VERSION:
+        raise ValueError("unsupported snapshot version in {0}".format(path))
+    return snap
+
+
+def _coalesce(spans):
+    """Merge overlapping or touching (start, end) spans."""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _entries_in(entries, keys, start, end):
+    """Slice a sorted [[addr, value], ...] list to start..end."""
+    lo = bisect_left(keys, start)
+    hi = bisect_right(keys, end)
+    return dict((a, v) for a, v in entries[lo:hi])
+
+
+def _compare_entries(old, new):
+    """Return sorted (addr, old_value, new_value) for differing entries."""
+    changes = []
+    for addr in sorted(set(old) | set(new)):
+        ov = old.get(addr)
+        nv = new.get(addr)
+        if ov != nv:
+            changes.append((addr, ov, nv))
+    return changes
+
+
+def _kind_segments(regions, starts, start, end):
+    """Yield (seg_start, seg_end, kind) of *regions* clipped to start..end."""
+    idx = max(0, bisect_right(starts, start) - 1)
+    while idx < len(regions) and regions[idx][0] <= end:
+        r_start, r_end, kind = regions[idx][0], regions[idx][1], regions[idx][2]
+        if r_end >= start:
+            yield max(r_start, start), min(r_end, end), kind
+        idx += 1
+
+
+def _kind_at(segs, seg_starts, addr):
+    """Kind of the segment covering *addr*, or None."""
+    idx = bisect_right(seg_starts, addr) - 1
+    if idx >= 0 and addr <= segs[idx][1]:
+        return segs[idx][2]
+    return None
+
+
+def diff_snapshots(old, new):
+    """
+    Compare two snapshots by address.
+
+    Regions that are identical in both (bounds, kind and digest) are
+    skipped outright, so the work is proportional to the number of
+    regions plus the entries inside the regions that actually changed.
+    Returns {"regions": [(start, end, old_kind, new_kind)],
+             "labels": [(addr, old, new)], "comments": [(addr, old, new)]}.
+    """
+    old_set = set(tuple(r) for r in old["regions"])
+    new_set = set(tuple(r) for r in new["regions"])
+    dirty = [(r[0], r[1]) for r in old["regions"] if tuple(r) not in new_set]
+    dirty += [(r[0], r[1]) for r in new["regions"] if tuple(r) not in old_set]
+    dirty = _coalesce(dirty)
+
+    result = {"regions": [], "labels": [], "comments": []}
+    old_starts = [r[0] for r in old["regions"]]
+    new_starts = [r[0] for r in new["regions"]]
+    tables = {}
+    if dirty:
+        for name in ("labels", "comments"):
+            tables[name] = (old[name], [e[0] for e in old[name]],
+                            new[name], [e[0] for e in new[name]])
+
+    for start, end in dirty:
+        # Sweep both region lists over the dirty span for kind changes
+        bounds = set([start, end + 1])
+        old_segs = list(_kind_segments(old["regions"], old_starts, start, end))
+        new_segs = list(_kind_segments(new["regions"], new_starts, start, end))
+        for s_start, s_end, _ in old_segs + new_segs:
+            bounds.add(s_start)
+            bounds.add(s_end + 1)
+        bounds = sorted(bounds)
+        old_seg_starts = [seg[0] for seg in old_segs]
+        new_seg_starts = [seg[0] for seg in new_segs]
+        for b_start, b_next in zip(bounds, bounds[1:]):
+            old_kind = _kind_at(old_segs, old_seg_starts, b_start)
+            new_kind = _kind_at(new_segs, new_seg_starts, b_start)
+            if old_kind == new_kind:
+                continue
+            prev = result["regions"][-1] if result["regions"] else None
+            if (prev and prev[1] + 1 == b_start
+                    and prev[2] == old_kind and prev[3] == new_kind):
+                result["regions"][-1] = (prev[0], b_next - 1, old_kind, new_kind)
+            else:
+                result["regions"].append((b_start, b_next - 1, old_kind, new_kind))
+
+        for name in ("labels", "comments"):
+            o_entries, o_keys, n_entries, n_keys = tables[name]
+            result[name].extend(_compare_entries(
+                _entries_in(o_entries, o_keys, start, end),
+                _entries_in(n_entries, n_keys, start, end)))
+
+    # Entries outside every region: anything that moved into a region on
+    # either side was already compared with that region above
+    old_spans = SpanIndex(old_starts, [r[1] for r in old["regions"]])
+    new_spans = SpanIndex(new_starts, [r[1] for r in new["regions"]])
+    for name in ("labels", "comments"):
+        if old["external"][name] != new["external"][name]:
+            for addr, ov, nv in _compare_entries(
+                    dict((a, v) for a, v in old["external"][name]),
+                    dict((a, v) for a, v in new["external"][name])):
+                if old_spans.find(addr) is None and new_spans.find(addr) is None:
+                    result[name].append((addr, ov, nv))
+        result[name].sort()
+    return result
+
+
+def format_snapshot_diff(diff):
+    """Render a diff_snapshots() result as report lines."""
+    def first_line(text):
+        return text.split("\n", 1)[0] if text else ""
+
+    lines = ["; Snapshot diff: {0} region change(s), {1} label change(s), "
+             "{2} comment change(s)".format(
+                 len(diff["regions"]), len(diff["labels"]), len(diff["comments"]))]
+    if diff["regions"]:
+        lines.append("; Reclassified regions:")
+        for start, end, ok, nk in diff["regions"]:
+            lines.append(";   ${0:04X}-${1:04X}: {2} -> {3}".format(
+                start, end, ok or "(none)", nk or "(none)"))
+    if diff["labels"]:
+        lines.append("; Labels:")
+        for addr, ov, nv in diff["labels"]:
+            if ov is None:
+                lines.append(";   ${0:04X}: + {1}".format(addr, nv))
+            elif nv is None:
+                lines.append(";   ${0:04X}: - {1}".format(addr, ov))
+            else:
+                lines.append(";   ${0:04X}: {1} -> {2}".format(addr, ov, nv))
+    if diff["comments"]:
+        lines.append("; Comments:")
+        for addr, ov, nv in diff["comments"]:
+            if ov is None:
+                lines.append(";   ${0:04X}: + {1}".format(addr, first_line(nv)))
+            elif nv is None:
+                lines.append(";   ${0:04X}: - {1}".format(addr, first_line(ov)))
+            else:
+                lines.append(";   ${0:04X}: ~ {1}".format(addr, first_line(nv)))
+    return lines
+
+
 # ===================================================================
 #  String finder (top-level, for header summary)
 # ===================================================================
@@ -892,7 +1844,30 @@ def parse_args():
                              "(on by default with flow tracing)")
     parser.add_argument("--no-smc", action="store_true",
                         help="Disable self-modifying code detection")
-    return parser.parse_args()
+    parser.add_argument("--index-reach", type=int, default=0,
+                        help="Assumed range of an unknown X/Y index for "
+                             "indexed SMC writes (0-255, default: 0)")
+    parser.add_argument("--save-snapshot", metavar="FILE", default=None,
+                        help="Write an address-keyed analysis snapshot (JSON) "
+                             "for later --diff runs (flow tracing mode)")
+    parser.add_argument("--diff", metavar="FILE", default=None,
+                        help="Compare this analysis against a saved snapshot "
+                             "and print a structured diff instead of a listing")
+    parser.add_argument("--window", default=None,
+                        help="Only format the listing window starting at this "
+                             "address in hex (flow tracing mode)")
+    parser.add_argument("--lines", type=int, default=40,
+                        help="Number of lines to print with --window "
+                             "(default: 40)")
+    args = parser.parse_args()
+    if args.linear:
+        for flag, value in (("--window", args.window),
+                            ("--save-snapshot", args.save_snapshot),
+                            ("--diff", args.diff)):
+            if value is not None:
+                parser.error("{0} needs flow tracing mode; it cannot be "
+                             "combined with --linear".format(flag))
+    return args
 
 
 # ===================================================================
@@ -940,10 +1915,11 @@ def main():
 
     # ---- Perform analysis ----
     smc_results = []
+    unresolved = []
 
     if not args.linear:
         # --- CFG tracing ---
-        tracer = FlowTracer(code, start_addr)
+        tracer = FlowTracer(code, start_addr, args.index_reach)
         for ep in entry_points:
             tracer.add_entry(ep)
         tracer.trace()
@@ -956,6 +1932,7 @@ def main():
 
         if enable_smc:
             smc_results = tracer.detect_smc()
+            unresolved = sorted(set(tracer.unresolved_writes))
 
         # Also run linear scan to catch any targets the tracer might
         # reference but not trace (e.g. targets outside binary).
@@ -980,14 +1957,19 @@ def main():
                 b = code[i]
                 if b in OPCODES:
                     mnem, mode, size = OPCODES[b]
-                    if mnem in STORE_MNEMONICS and mode in STORE_ABS_MODES and size <= len(code) - i:
+                    if ((mnem in STORE_MNEMONICS or mnem in RMW_MNEMONICS)
+                            and (mode in STORE_ABS_MODES or mode in STORE_INDEXED_MODES)
+                            and size <= len(code) - i):
                         if size == 2:
                             operand = code[i + 1]
                         else:
                             operand = code[i + 1] | (code[i + 2] << 8)
-                        if start_addr <= operand < end_addr:
-                            data_refs.add(operand)
-                            smc_results.append((pc, operand))
+                        first, last = FlowTracer._write_span(
+                            mode, operand, {}, {}, args.index_reach)
+                        if first < end_addr and last >= start_addr:
+                            if mode in STORE_ABS_MODES:
+                                data_refs.add(operand)
+                            smc_results.append((pc, max(first, start_addr)))
                     pc += size
                     i += size
                 else:
@@ -997,11 +1979,29 @@ def main():
     # Build labels
     labels = build_label_map(jsr_targets, jmp_targets, branch_targets, data_refs)
 
+    # ---- Snapshots ----
+    if (args.save_snapshot or args.diff) and byte_type is not None:
+        snap = snapshot_from_analysis(start_addr, byte_type, labels,
+                                      smc_results if enable_smc else [])
+        if args.save_snapshot:
+            save_snapshot(args.save_snapshot, snap)
+            print("; Snapshot written to {0}".format(args.save_snapshot))
+        if args.diff:
+            diff = diff_snapshots(load_snapshot(args.diff), snap)
+            for line in format_snapshot_diff(diff):
+                print(line)
+            return
+
     # ---- SMC summary ----
     if enable_smc and smc_results:
         print("; Self-modifying code detected: {0} locations".format(len(smc_results)))
         for writer, target in sorted(smc_results):
             print(";   ${0:04X} writes to code at ${1:04X}".format(writer, target))
+    if enable_smc and unresolved:
+        print("; Indirect stores with unresolved pointers: {0} (not checked "
+              "for SMC)".format(len(unresolved)))
+        for writer, zp in unresolved:
+            print(";   ${0:04X} stores through (${1:02X})".format(writer, zp))
     print()
 
     # ---- Strings summary ----
@@ -1024,7 +2024,10 @@ def main():
     # ---- Emit disassembly ----
     smc_set = set((w, t) for w, t in smc_results) if enable_smc else set()
 
-    if not args.linear and byte_type is not None:
+    if args.window and not args.linear and byte_type is not None:
+        listing = Disassembly(code, start_addr, byte_type, labels, smc_set)
+        output = listing.window(int(args.window, 16), args.lines)
+    elif not args.linear and byte_type is not None:
         output = disassemble_with_cfg(code, start_addr, byte_type, labels, smc_set)
     else:
         output = disassemble_linear(code, start_addr, labels, smc_set)
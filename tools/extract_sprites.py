@@ -6,7 +6,8 @@ Extracts and renders Apple II hi-res graphics sprites from binary files as PNG i
 Supports three extraction modes:
   1. Manual: fixed offset, width, height, count
   2. Table-driven: pointer/width/height tables (common Apple II sprite format)
-  3. Auto-detect: scan for parallel pointer table pairs
+  3. Auto-detect: scan for parallel pointer table pairs and the width/height
+     tables that go with them
 
 HGR color encoding:
   - Each byte = 7 pixels (bits 0-6), bit 7 = palette selector
@@ -17,9 +18,15 @@ Cowritten by Claude Code Opus 4.6
 """
 
 import argparse
+import heapq
+import json
+import re
 import struct
 import sys
 import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from operator import add, getitem, mul
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -45,42 +52,117 @@ def _png_chunk(chunk_type, data):
     return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xFFFFFFFF)
 
 
-def write_png(filepath, pixels, width, height):
-    """
-    Write an RGB PNG file from a flat pixel list.
+# Palette order for indexed output; index 0 is black (the fill color)
+HGR_PALETTE = ('black', 'white', 'purple', 'green', 'blue', 'orange')
+_PALETTE_RGB = [bytes(COLORS[name]) for name in HGR_PALETTE]
 
-    pixels: list of (r, g, b) tuples, length = width * height, row-major order.
-    """
-    # Try Pillow first for better compression / broader format support
-    try:
-        from PIL import Image
-        img = Image.new('RGB', (width, height))
-        img.putdata(pixels)
-        img.save(filepath)
-        return
-    except ImportError:
-        pass
+# The six HGR colors all differ in their green channel, so a packed RGB
+# image maps to palette indices with one translate() over its G bytes
+_GREEN_TO_INDEX = bytearray(256)
+for _index, _name in enumerate(HGR_PALETTE):
+    _GREEN_TO_INDEX[COLORS[_name][1]] = _index
+_GREEN_TO_INDEX = bytes(_GREEN_TO_INDEX)
+
+PNG_IDAT_SIZE = 1 << 16
 
-    # Fallback: minimal PNG using stdlib zlib + struct
-    raw_rows = bytearray()
-    for y in range(height):
-        raw_rows.append(0)  # filter byte: None
-        for x in range(width):
-            r, g, b = pixels[y * width + x]
-            raw_rows.append(r)
-            raw_rows.append(g)
-            raw_rows.append(b)
 
-    compressed = zlib.compress(bytes(raw_rows))
+def rgb_to_indexed(pixels):
+    """
+    Convert packed RGB pixels to HGR palette indices (one byte per pixel).
+    Returns None if the image uses any color outside the HGR palette.
+    """
+    indices = bytes(pixels[1::3]).translate(_GREEN_TO_INDEX)
+    if b''.join(map(_PALETTE_RGB.__getitem__, indices)) != bytes(pixels):
+        return None
+    return indices
+
+
+_EXPAND_TABLES = {}
+
+
+def _expand_row(row, scale, bpp):
+    """Repeat each pixel of a packed row *scale* times horizontally."""
+    if scale == 1:
+        return bytes(row)
+    if bpp == 1:
+        table = _EXPAND_TABLES.get(scale)
+        if table is None:
+            table = _EXPAND_TABLES[scale] = [bytes([i]) * scale for i in range(256)]
+        return b''.join(map(table.__getitem__, row))
+    # Interleave: output byte (pixel * scale + k) * bpp + c comes from
+    # input byte pixel * bpp + c, filled with one strided slice per (k, c)
+    row = bytes(row)
+    out = bytearray(len(row) * scale)
+    step = bpp * scale
+    for k in range(scale):
+        for c in range(bpp):
+            out[k * bpp + c::step] = row[c::bpp]
+    return bytes(out)
+
+
+def write_png(filepath, pixels, width, height, palette=None, scale=1):
+    """
+    Write a PNG file from packed pixel bytes.
+
+    pixels: width * height * 3 packed RGB bytes, row-major order; or, when
+    *palette* (a list of (r, g, b)) is given, width * height index bytes.
+    RGB images that use only HGR colors are written as 8-bit palette PNGs.
+    *scale* enlarges the image while encoding: each row is expanded once
+    and its repeats are written as Up-filtered zero rows.
+    Rows are streamed through zlib.compressobj; each row is stored with
+    the Up filter when it repeats the row above and unfiltered otherwise.
+    """
+    scale = max(1, scale)
+    if palette is None:
+        indices = rgb_to_indexed(pixels)
+        if indices is not None:
+            pixels, palette = indices, [COLORS[name] for name in HGR_PALETTE]
+
+    if palette is None:
+        # Not palettizable: let Pillow compress it if available
+        try:
+            from PIL import Image
+            img = Image.frombytes('RGB', (width, height), bytes(pixels))
+            if scale > 1:
+                img = img.resize((width * scale, height * scale), Image.NEAREST)
+            img.save(filepath)
+            return
+        except ImportError:
+            pass
+
+    bpp = 1 if palette is not None else 3
+    stride = width * bpp
+    zero_row = b'\x02' + bytes(stride * scale)
 
     with open(filepath, 'wb') as f:
         # PNG signature
         f.write(b'\x89PNG\r\n\x1a\n')
-        # IHDR: width, height, bit_depth=8, color_type=2 (RGB)
-        ihdr_data = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+        # IHDR: width, height, bit_depth=8, color_type=3 (palette) or 2 (RGB)
+        ihdr_data = struct.pack('>IIBBBBB', width * scale, height * scale, 8,
+                                3 if palette is not None else 2, 0, 0, 0)
         f.write(_png_chunk(b'IHDR', ihdr_data))
-        # IDAT
-        f.write(_png_chunk(b'IDAT', compressed))
+        if palette is not None:
+            f.write(_png_chunk(b'PLTE', b''.join(bytes(c) for c in palette)))
+
+        # IDAT: stream filtered rows through the compressor
+        compressor = zlib.compressobj(9)
+        pending = bytearray()
+        view = memoryview(pixels)
+        prev = None
+        for y in range(height):
+            row = view[y * stride:(y + 1) * stride]
+            if prev is not None and row == prev:
+                pending += compressor.compress(zero_row * scale)          # Up
+            else:
+                pending += compressor.compress(
+                    b'\x00' + _expand_row(row, scale, bpp))               # None
+                pending += compressor.compress(zero_row * (scale - 1))
+            prev = row
+            if len(pending) >= PNG_IDAT_SIZE:
+                f.write(_png_chunk(b'IDAT', bytes(pending)))
+                pending.clear()
+        pending += compressor.flush()
+        f.write(_png_chunk(b'IDAT', bytes(pending)))
         # IEND
         f.write(_png_chunk(b'IEND', b''))
 
@@ -143,36 +225,246 @@ def render_hgr_row(row_bytes):
     return pixels
 
 
+def _build_row_lut():
+    """
+    Precompute the 7 output pixels of every byte in every context.
+
+    The color of a pixel depends only on its own bit, its two neighbours
+    and the column parity, so a byte's 7 pixels are fixed by the byte, the
+    last pixel of the byte to its left, the first pixel of the byte to its
+    right, and the parity of its byte index (7 * i has the parity of i).
+    Returns 8 tables indexed [parity * 4 + left * 2 + right][byte], each
+    entry 21 RGB bytes identical to what render_hgr_row produces.
+    """
+    lut = []
+    for parity in (0, 1):
+        for left in (0, 1):
+            for right in (0, 1):
+                table = []
+                for byte_val in range(256):
+                    bits = [left] + [(byte_val >> b) & 1 for b in range(7)] + [right]
+                    palette = (byte_val >> 7) & 1
+                    chunk = bytearray()
+                    for b in range(7):
+                        if not bits[b + 1]:
+                            chunk += bytes(COLORS['black'])
+                        elif bits[b] or bits[b + 2]:
+                            chunk += bytes(COLORS['white'])
+                        elif (parity + b) % 2 == 0:
+                            chunk += bytes(COLORS['blue' if palette else 'purple'])
+                        else:
+                            chunk += bytes(COLORS['orange' if palette else 'green'])
+                    table.append(bytes(chunk))
+                lut.append(table)
+    return lut
+
+
+_ROW_LUT = _build_row_lut()
+
+# Per-byte context components, combined with bytes.translate and map()
+_LEFT_CTX = bytes(((b >> 6) & 1) * 2 for b in range(256))   # left byte's bit 6
+_RIGHT_CTX = bytes(b & 1 for b in range(256))               # right byte's bit 0
+_PARITY_CTX = bytes((i & 1) * 4 for i in range(256))
+
+
+def render_hgr_row_rgb(row_bytes):
+    """
+    Render one row of HGR data to packed RGB bytes (21 bytes per input byte).
+
+    Same output as render_hgr_row, but the neighbour context of every byte
+    is computed with translate() over shifted copies of the row and each
+    byte becomes one table lookup.
+    """
+    n = len(row_bytes)
+    if not n:
+        return b''
+    row = bytes(row_bytes)
+    parity = _PARITY_CTX[:n] if n <= 256 else bytes((i & 1) * 4 for i in range(n))
+    ctx = map(add, map(add, parity, (b'\0' + row[:-1]).translate(_LEFT_CTX)),
+              (row[1:] + b'\0').translate(_RIGHT_CTX))
+    return b''.join(map(getitem, map(_ROW_LUT.__getitem__, ctx), row))
+
+
 def render_sprite(data, width_bytes, height):
     """
     Render a complete sprite (width_bytes * height bytes of HGR data).
-    Returns (pixel_list, pixel_width, pixel_height).
+    Returns (rgb_bytes, pixel_width, pixel_height); rgb_bytes is a packed
+    row-major bytearray of pixel_width * pixel_height * 3 bytes.
     """
     pixel_width = width_bytes * 7
-    all_pixels = []
+    stride = pixel_width * 3
+    out = bytearray(stride * height)
     for row in range(height):
         offset = row * width_bytes
         row_data = data[offset:offset + width_bytes]
         if len(row_data) < width_bytes:
             # Pad short rows with zeros (black)
-            row_data = row_data + bytes(width_bytes - len(row_data))
-        all_pixels.extend(render_hgr_row(row_data))
-    return all_pixels, pixel_width, height
-
-
-def scale_pixels(pixels, width, height, scale):
-    """Scale pixel data by an integer factor (nearest-neighbor)."""
-    if scale <= 1:
-        return pixels, width, height
-    new_width = width * scale
-    new_height = height * scale
-    scaled = []
-    for y in range(new_height):
-        src_y = y // scale
-        for x in range(new_width):
-            src_x = x // scale
-            scaled.append(pixels[src_y * width + src_x])
-    return scaled, new_width, new_height
+            row_data = bytes(row_data) + bytes(width_bytes - len(row_data))
+        out[row * stride:(row + 1) * stride] = render_hgr_row_rgb(row_data)
+    return out, pixel_width, height
+
+
+# ---------------------------------------------------------------------------
+# Full HGR screen decoding
+# ---------------------------------------------------------------------------
+
+HGR_PAGE_SIZE = 0x2000
+HGR_PAGE_ADDR = {1: 0x2000, 2: 0x4000}
+HGR_ROW_BYTES = 40
+
+# Offset of each of the 192 scan lines within an HGR page: the screen is
+# split into 3 bands of 64 lines; within a band, line y is at
+# (y & 7) * $400 + ((y >> 3) & 7) * $80 + band * $28
+HGR_ROW_OFFSETS = tuple((y & 7) * 0x400 + ((y >> 3) & 7) * 0x80 + (y >> 6) * 0x28
+                        for y in range(192))
+
+
+def hgr_page_from_dump(data, page=1, offset=None):
+    """
+    Locate an HGR page inside a dump and return it as a memoryview.
+
+    Accepts a bare page (8 KB, or a BSAVE of $1FF8 bytes, zero-padded), a
+    memory snapshot starting at $0000 (the page is taken at $2000/$4000),
+    or an explicit file *offset*.
+    """
+    view = memoryview(data)
+    if offset is None:
+        if len(data) <= HGR_PAGE_SIZE:
+            offset = 0
+        elif len(data) >= HGR_PAGE_ADDR[page] + HGR_PAGE_SIZE:
+            offset = HGR_PAGE_ADDR[page]
+        else:
+            raise ValueError('%d-byte file is neither an HGR page nor a memory '
+                             'snapshot; give --screen-offset' % len(data))
+    page_view = view[offset:offset + HGR_PAGE_SIZE]
+    if len(page_view) < HGR_PAGE_SIZE:
+        page_view = memoryview(bytes(page_view) + bytes(HGR_PAGE_SIZE - len(page_view)))
+    return page_view
+
+
+def hgr_screen_rows(page_view):
+    """Return the 192 scan lines of a page as zero-copy 40-byte slices."""
+    return [page_view[off:off + HGR_ROW_BYTES] for off in HGR_ROW_OFFSETS]
+
+
+def render_hgr_screen(page_view):
+    """
+    Render an 8 KB HGR page to a 280x192 image.
+    Returns (rgb_bytes, 280, 192) with packed RGB pixels.
+    """
+    stride = HGR_ROW_BYTES * 7 * 3
+    out = bytearray(stride * 192)
+    for y, row in enumerate(hgr_screen_rows(page_view)):
+        out[y * stride:(y + 1) * stride] = render_hgr_row_rgb(row)
+    return out, HGR_ROW_BYTES * 7, 192
+
+
+def render_hgr_screens(pages):
+    """
+    Render several HGR pages, using render_hgr_batch when NumPy is present.
+    Returns a list of (rgb_bytes, 280, 192).
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return [render_hgr_screen(p) for p in pages]
+    order = np.array(HGR_ROW_OFFSETS)[:, None] + np.arange(HGR_ROW_BYTES)
+    stack = np.stack([np.frombuffer(p, dtype=np.uint8)[order] for p in pages])
+    return [(bytearray(f.tobytes()), HGR_ROW_BYTES * 7, 192)
+            for f in render_hgr_batch(stack)]
+
+
+# ---------------------------------------------------------------------------
+# NumPy batch renderer (optional)
+# ---------------------------------------------------------------------------
+
+def render_hgr_batch(frames):
+    """
+    Render a stack of HGR bitmaps with NumPy.
+
+    frames: array-like of shape (N, H, width_bytes), dtype uint8.
+    Returns an (N, H, width_bytes * 7, 3) uint8 RGB array with the same
+    pixels render_hgr_row gives row by row.  Raises ImportError when
+    NumPy is not installed.
+    """
+    import numpy as np
+
+    frames = np.asarray(frames, dtype=np.uint8)
+    n, h, wb = frames.shape
+    width = wb * 7
+    # bits 0-6 of each byte, least significant (leftmost pixel) first
+    bits = np.unpackbits(frames[..., None], axis=-1, bitorder='little')[..., :7]
+    bits = bits.reshape(n, h, width).astype(bool)
+    high = np.repeat(frames >> 7, 7, axis=-1).astype(np.uint8)
+
+    neighbour = np.zeros_like(bits)
+    neighbour[..., 1:] |= bits[..., :-1]
+    neighbour[..., :-1] |= bits[..., 1:]
+    white = bits & neighbour
+    colored = bits & ~neighbour
+
+    odd = (np.arange(width) & 1).astype(np.uint8)
+    index = np.where(white, 1, np.where(colored, 2 + high * 2 + odd, 0))
+    palette = np.array([COLORS[name] for name in HGR_PALETTE], dtype=np.uint8)
+    return palette[index]
+
+
+def check_batch_renderer(rows=2000, seed=6502):
+    """
+    Conformance check: render_hgr_batch must match render_hgr_row exactly.
+
+    Compares edge-case rows (blank, solid, alternating, single bits at
+    byte boundaries) and *rows* random rows of random widths.  Returns a
+    list of failure descriptions (empty on success).
+    """
+    import random
+
+    rng = random.Random(seed)
+    cases = [bytes(w) for w in (1, 2, 40)]
+    cases += [bytes([v]) * w for v in (0x7F, 0xFF, 0x55, 0xAA, 0x2A, 0xD5,
+                                       0x01, 0x40, 0x81, 0xC0) for w in (1, 2, 3, 40)]
+    cases += [bytes([0x40, 0x01]), bytes([0xC0, 0x81]), bytes([0x40, 0x80, 0x01])]
+    cases += [bytes(rng.getrandbits(8) for _ in range(rng.randint(1, 40)))
+              for _ in range(rows)]
+
+    failures = []
+    by_width = {}
+    for row in cases:
+        by_width.setdefault(len(row), []).append(row)
+    for wb, group in sorted(by_width.items()):
+        batch = render_hgr_batch([[list(r)] for r in group])
+        for row, frame in zip(group, batch):
+            expected = b''.join(bytes(px) for px in render_hgr_row(row))
+            if frame.tobytes() != expected:
+                failures.append('width %d row %s' % (wb, row.hex()))
+    return failures
+
+
+def render_sprites(raw_sprites):
+    """
+    Render a list of (data, width_bytes, height) sprites to packed RGB.
+
+    Sprites of equal size are rendered together with render_hgr_batch when
+    NumPy is available; otherwise each goes through render_sprite.
+    Returns a list of (rgb_bytes, pixel_width, pixel_height) in input order.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return [render_sprite(d, w, h) for d, w, h in raw_sprites]
+
+    rendered = [None] * len(raw_sprites)
+    groups = {}
+    for i, (sprite_data, w, h) in enumerate(raw_sprites):
+        groups.setdefault((w, h), []).append(i)
+    for (w, h), members in groups.items():
+        stack = np.zeros((len(members), h, w), dtype=np.uint8)
+        for k, i in enumerate(members):
+            raw = np.frombuffer(bytes(raw_sprites[i][0][:w * h]), dtype=np.uint8)
+            stack[k].flat[:len(raw)] = raw
+        for k, frame in zip(members, render_hgr_batch(stack)):
+            rendered[k] = (bytearray(frame.tobytes()), w * 7, h)
+    return rendered
 
 
 # ---------------------------------------------------------------------------
@@ -181,23 +473,23 @@ def scale_pixels(pixels, width, height, scale):
 
 # Map colors to single characters for terminal display
 _ASCII_MAP = {
-    COLORS['black']:  ' ',
-    COLORS['white']:  '#',
-    COLORS['purple']: 'P',
-    COLORS['green']:  'G',
-    COLORS['blue']:   'B',
-    COLORS['orange']: 'O',
+    bytes(COLORS['black']):  ' ',
+    bytes(COLORS['white']):  '#',
+    bytes(COLORS['purple']): 'P',
+    bytes(COLORS['green']):  'G',
+    bytes(COLORS['blue']):   'B',
+    bytes(COLORS['orange']): 'O',
 }
 
 
 def ascii_preview(pixels, width, height):
-    """Return an ASCII art string for a sprite."""
+    """Return an ASCII art string for a sprite (packed RGB pixels)."""
     lines = []
     for y in range(height):
         row_chars = []
         for x in range(width):
-            px = pixels[y * width + x]
-            row_chars.append(_ASCII_MAP.get(px, '?'))
+            i = (y * width + x) * 3
+            row_chars.append(_ASCII_MAP.get(bytes(pixels[i:i + 3]), '?'))
         lines.append(''.join(row_chars))
     return '\n'.join(lines)
 
@@ -210,27 +502,320 @@ def build_sprite_sheet(sprite_list, padding=2):
     """
     Combine a list of (pixels, width, height) into a single sprite sheet image.
     Sprites are arranged in a horizontal row with padding between them.
-    Returns (pixels, total_width, total_height).
+    Returns (pixels, total_width, total_height) with packed RGB pixels.
     """
     if not sprite_list:
-        return [], 0, 0
+        return bytearray(), 0, 0
 
     max_height = max(h for _, _, h in sprite_list)
     total_width = sum(w for _, w, _ in sprite_list) + padding * (len(sprite_list) - 1)
 
     # Fill with black
-    sheet = [COLORS['black']] * (total_width * max_height)
+    sheet = bytearray(total_width * max_height * 3)
 
     x_offset = 0
     for pixels, w, h in sprite_list:
         for y in range(h):
-            for x in range(w):
-                sheet[y * total_width + x_offset + x] = pixels[y * w + x]
+            dst = (y * total_width + x_offset) * 3
+            sheet[dst:dst + w * 3] = pixels[y * w * 3:(y + 1) * w * 3]
         x_offset += w + padding
 
     return sheet, total_width, max_height
 
 
+def pack_shelves(sizes, padding=2, max_width=None):
+    """
+    Place (width, height) boxes on shelves, tallest first.
+
+    Each box goes on the first shelf with room left and enough height,
+    otherwise on a new shelf below. The atlas width defaults to the side of
+    a square holding all padded boxes (never less than the widest box).
+    Returns (positions, width, height) with positions as (x, y) per box in
+    input order.
+    """
+    if not sizes:
+        return [], 0, 0
+    widest = max(w for w, _ in sizes)
+    if max_width is None:
+        area = sum((w + padding) * (h + padding) for w, h in sizes)
+        max_width = int(area ** 0.5) + 1
+    max_width = max(max_width, widest)
+
+    positions = [None] * len(sizes)
+    shelves = []        # [y, height, next free x]
+    bottom = 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i)):
+        w, h = sizes[i]
+        for shelf in shelves:
+            if h <= shelf[1] and shelf[2] + w <= max_width:
+                break
+        else:
+            shelf = [bottom, h, 0]
+            shelves.append(shelf)
+            bottom += h + padding
+        positions[i] = (shelf[2], shelf[0])
+        shelf[2] += w + padding
+
+    width = max(x + w for (x, _), (w, _) in zip(positions, sizes))
+    return positions, width, bottom - padding
+
+
+def build_sprite_atlas(sprite_list, padding=2, max_width=None):
+    """
+    Pack a list of (pixels, width, height) into a compact atlas image with
+    pack_shelves(). Returns (pixels, atlas_width, atlas_height, positions)
+    with packed RGB pixels and an (x, y) per sprite in input order.
+    """
+    positions, atlas_w, atlas_h = pack_shelves([(w, h) for _, w, h in sprite_list],
+                                               padding, max_width)
+    atlas = bytearray(atlas_w * atlas_h * 3)
+    for (pixels, w, h), (x, y) in zip(sprite_list, positions):
+        for row in range(h):
+            dst = ((y + row) * atlas_w + x) * 3
+            atlas[dst:dst + w * 3] = pixels[row * w * 3:(row + 1) * w * 3]
+    return atlas, atlas_w, atlas_h, positions
+
+
+# ---------------------------------------------------------------------------
+# Pre-shifted sprite groups
+# ---------------------------------------------------------------------------
+
+# 7-bit pixel strings per byte value, most significant pixel first, so a
+# row reads right to left as in the packed integer. _PALETTE_BITS keeps
+# the pixels of palette-1 bytes only.
+_PIXEL_BITS = [format(b & 0x7F, '07b') for b in range(256)]
+_PALETTE_BITS = [format(b & 0x7F, '07b') if b & 0x80 else '0000000' for b in range(256)]
+
+
+def pack_sprite_rows(sprite_data, width_bytes, height, field, table=_PIXEL_BITS):
+    """
+    Pack a sprite's pixels into one integer: screen pixel x of row y is bit
+    y * field + x, in HGR bit order (bit 0 of the first byte is leftmost).
+    With field wider than the row, shifting the integer left by k moves
+    every row k pixels to the right at once.
+    """
+    rows = []
+    for y in range(height - 1, -1, -1):
+        row = sprite_data[y * width_bytes:(y + 1) * width_bytes]
+        rows.append(''.join(map(table.__getitem__, reversed(row))).rjust(field, '0'))
+    return int(''.join(rows) or '0', 2)
+
+
+SHIFT_NEAR_MISS = 2     # pixels; closer copies are reported, not grouped
+
+
+def closest_shift(base, copy):
+    """
+    Return (k, pixels): the shift 1-6 that best maps base onto copy and the
+    number of pixels that still differ (0 for an exact pre-shifted copy),
+    or None if the heights differ. Both are (data, width_bytes, height);
+    palette bits are not compared.
+    """
+    (base_data, base_w, height), (copy_data, copy_w, copy_h) = base, copy
+    if copy_h != height:
+        return None
+    field = 7 * (max(base_w, copy_w) + 1)
+    packed = pack_sprite_rows(base_data, base_w, height, field)
+    target = pack_sprite_rows(copy_data, copy_w, height, field)
+    return min(((k, bin((packed << k) ^ target).count('1')) for k in range(1, 7)),
+               key=lambda c: c[1])
+
+
+def palette_mismatches(base, copy, k):
+    """
+    Count bytes of a shifted copy whose palette bit disagrees with the
+    palette of the base pixels it shows. Bytes with no pixels set, or with
+    pixels from bytes of both palettes, are not counted.
+    """
+    (base_data, base_w, height), (copy_data, copy_w, _) = base, copy
+    field = 7 * (max(base_w, copy_w) + 1)
+    expected = pack_sprite_rows(base_data, base_w, height, field, _PALETTE_BITS) << k
+    mismatches = 0
+    for y in range(height):
+        for j in range(copy_w):
+            value = copy_data[y * copy_w + j]
+            pixels = value & 0x7F
+            if not pixels:
+                continue
+            palette = (expected >> (y * field + 7 * j)) & pixels
+            if (palette == pixels and not value & 0x80) or (not palette and value & 0x80):
+                mismatches += 1
+    return mismatches
+
+
+def find_shift_groups(raw_sprites):
+    """
+    Find runs of pre-shifted copies in a list of (data, width_bytes, height).
+
+    A group starts at a sprite with pixels set and extends over the
+    following sprites while each is the first one shifted by a new k
+    (1-6 pixels), in any order; at most 7 copies. Returns a list of dicts
+    with start, count, shifts (shift of each copy, 0 first), widths and
+    palette_mismatches, one per group of two or more copies. When the
+    sprite after a short group is within SHIFT_NEAR_MISS pixels of a
+    missing shift, near_miss holds its [index, shift, pixels].
+    """
+    groups = []
+    i = 0
+    while i < len(raw_sprites):
+        base = raw_sprites[i]
+        shifts = [0]
+        near_miss = None
+        if any(b & 0x7F for b in base[0][:base[1] * base[2]]):
+            while i + len(shifts) < len(raw_sprites) and len(shifts) < 7:
+                match = closest_shift(base, raw_sprites[i + len(shifts)])
+                if match is None or match[0] in shifts:
+                    break
+                if match[1]:
+                    if match[1] <= SHIFT_NEAR_MISS:
+                        near_miss = [i + len(shifts), match[0], match[1]]
+                    break
+                shifts.append(match[0])
+        if len(shifts) > 1:
+            members = raw_sprites[i:i + len(shifts)]
+            groups.append({
+                'start': i,
+                'count': len(shifts),
+                'shifts': shifts,
+                'widths': [w for _, w, _ in members],
+                'palette_mismatches': sum(palette_mismatches(base, copy, k)
+                                          for copy, k in zip(members[1:], shifts[1:])),
+                'near_miss': near_miss,
+            })
+        i += len(shifts)
+    return groups
+
+
+def canonical_sprites(raw_sprites, groups):
+    """
+    Return (indices, sprites): every sprite that is not a shifted copy,
+    i.e. each group's unshifted first sprite plus all ungrouped sprites.
+    """
+    copies = set()
+    for g in groups:
+        copies.update(range(g['start'] + 1, g['start'] + g['count']))
+    indices = [i for i in range(len(raw_sprites)) if i not in copies]
+    return indices, [raw_sprites[i] for i in indices]
+
+
+def shift_group_report(raw_sprites, groups):
+    """Return the verification report for find_shift_groups() as text."""
+    grouped = sum(g['count'] for g in groups)
+    lines = ["Shift groups: %d group(s) covering %d of %d sprite(s); %d canonical sprite(s)"
+             % (len(groups), grouped, len(raw_sprites),
+                len(raw_sprites) - grouped + len(groups))]
+    for g in groups:
+        palette = ("palette ok" if not g['palette_mismatches']
+                   else "%d palette mismatch(es)" % g['palette_mismatches'])
+        lines.append("  [%3d-%3d] %d copies  shifts %s  widths %s  pixels exact, %s"
+                     % (g['start'], g['start'] + g['count'] - 1, g['count'],
+                        ','.join(map(str, g['shifts'])),
+                        ','.join(map(str, g['widths'])), palette))
+        if g['near_miss']:
+            lines.append("            sprite %d is shift %d with %d pixel(s) different"
+                         % tuple(g['near_miss']))
+    return '\n'.join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Sprite output (optionally across a process pool)
+# ---------------------------------------------------------------------------
+
+def _write_sprite(task):
+    """Worker: render one sprite and write its PNG. Returns the rendered pixels."""
+    sprite_data, width_bytes, height, path, scale = task
+    pixels, px_w, px_h = render_sprite(sprite_data, width_bytes, height)
+    write_png(path, pixels, px_w, px_h, scale=scale)
+    return pixels, px_w, px_h
+
+
+def write_sprites(raw_sprites, out_dir, scale, jobs=1, indices=None):
+    """
+    Render and write sprite_NN.png for each (data, width_bytes, height).
+    NN is the sprite's position in the list, or the matching entry of
+    *indices* when only some of the extracted sprites are written.
+
+    With jobs > 1 the sprites are rendered and PNG-encoded in a process
+    pool; results come back in input order, so file names and the returned
+    list are the same as a sequential run. Returns (rendered, paths) where
+    rendered holds (rgb_bytes, pixel_width, pixel_height) at 1x.
+    """
+    if indices is None:
+        indices = range(len(raw_sprites))
+    paths = [str(Path(out_dir) / ("sprite_%02d.png" % i)) for i in indices]
+    if jobs <= 1 or len(raw_sprites) < 2:
+        rendered = render_sprites(raw_sprites)
+        for (pixels, px_w, px_h), path in zip(rendered, paths):
+            write_png(path, pixels, px_w, px_h, scale=scale)
+        return rendered, paths
+
+    tasks = [(bytes(d), w, h, path, scale) for (d, w, h), path in zip(raw_sprites, paths)]
+    chunk = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        rendered = list(pool.map(_write_sprite, tasks, chunksize=chunk))
+    return rendered, paths
+
+
+def write_manifest(out_dir, source, scale, raw_sprites, rendered, paths, sheet=None,
+                   indices=None, groups=None):
+    """
+    Write manifest.json describing every file produced by a run.
+
+    Each sprite entry records its index, file name, source size in bytes and
+    rows, pixel size at 1x and as written, and the PNG file size. sheet is
+    an optional (path, width, height) for the sprite sheet; groups is the
+    optional find_shift_groups() result.
+    """
+    if indices is None:
+        indices = range(len(raw_sprites))
+    entries = []
+    for i, (_, wb, h), (_, px_w, px_h), path in zip(indices, raw_sprites, rendered, paths):
+        entries.append({
+            'index': i,
+            'file': Path(path).name,
+            'width_bytes': wb,
+            'height': h,
+            'pixel_size': [px_w, px_h],
+            'png_size': [px_w * scale, px_h * scale],
+            'file_bytes': Path(path).stat().st_size,
+        })
+    manifest = {'source': source, 'scale': scale, 'sprites': entries}
+    if sheet is not None:
+        sheet_path, sheet_w, sheet_h = sheet
+        manifest['sheet'] = {
+            'file': Path(sheet_path).name,
+            'png_size': [sheet_w * scale, sheet_h * scale],
+            'file_bytes': Path(sheet_path).stat().st_size,
+        }
+    if groups is not None:
+        manifest['shift_groups'] = groups
+
+    manifest_path = Path(out_dir) / 'manifest.json'
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    return manifest_path
+
+
+def write_atlas_index(path, image_path, scale, rendered, positions, indices=None):
+    """
+    Write the JSON index for an atlas image: the atlas size and, per
+    sprite, its index and x, y, w, h rectangle in output (scaled) pixels.
+    """
+    if indices is None:
+        indices = range(len(rendered))
+    frames = []
+    for i, (_, w, h), (x, y) in zip(indices, rendered, positions):
+        frames.append({'index': i, 'x': x * scale, 'y': y * scale,
+                       'w': w * scale, 'h': h * scale})
+    width = max(f['x'] + f['w'] for f in frames) if frames else 0
+    height = max(f['y'] + f['h'] for f in frames) if frames else 0
+    with open(path, 'w') as f:
+        json.dump({'image': Path(image_path).name, 'scale': scale,
+                   'size': [width, height], 'sprites': frames}, f, indent=2)
+        f.write('\n')
+
+
 # ---------------------------------------------------------------------------
 # Extraction modes
 # ---------------------------------------------------------------------------
@@ -303,74 +888,218 @@ def extract_table_driven(data, ptr_lo_offset, ptr_hi_offset, width_tbl_offset,
     return sprites
 
 
-def auto_detect_sprites(data, base_addr, min_count=4, max_count=128):
+def _pointer_masks(base_addr, file_size):
+    """
+    Build translate() tables for the "lo | hi << 8 in range" test.
+
+    Each lo byte maps to flags (1: >= low byte of the first address,
+    2: <= low byte of the last address) and each hi byte to a page class
+    times 4 (1: inside, 2: first page, 3: last page). Adding the two and
+    translating through the returned verdict table gives 1 for a pair that
+    points into [base_addr, base_addr + file_size).
+    """
+    last = base_addr + file_size - 1
+    first_page, last_page = base_addr >> 8, last >> 8
+    lo_flags = bytes((b >= (base_addr & 0xFF)) | ((b <= (last & 0xFF)) << 1)
+                     for b in range(256))
+    hi_class = bytearray(256)
+    for page in range(first_page, min(last_page, 0xFF) + 1):
+        if first_page == last_page:
+            hi_class[page] = 16             # both bounds apply (class 4)
+        elif page == first_page:
+            hi_class[page] = 8
+        elif page == last_page:
+            hi_class[page] = 12
+        else:
+            hi_class[page] = 4
+    verdict = bytearray(256)
+    for v in range(20):
+        flags, page_class = v & 3, v >> 2
+        verdict[v] = (page_class == 1 or (page_class == 2 and flags & 1)
+                      or (page_class == 3 and flags & 2) or (page_class == 4 and flags == 3))
+    return lo_flags, bytes(hi_class), bytes(verdict)
+
+
+# Fraction of a candidate's steps that must ascend; unrelated in-range
+# byte pairs ascend about half the time
+AUTO_MIN_ASCENDING = 0.75
+
+
+def auto_detect_sprites(data, base_addr, min_count=4, max_count=256,
+                        min_ascending=AUTO_MIN_ASCENDING):
     """
     Scan for potential sprite table pairs in the binary.
 
-    Heuristic: look for two regions of `count` bytes each where:
+    Heuristic: look for two regions of `count` bytes each, `stride` bytes
+    apart (stride >= count, so the tables may be adjacent or not), where:
       - Combining low[i] | (high[i] << 8) yields addresses that all point
         within the binary's address range [base_addr, base_addr + len(data)).
-      - The addresses are roughly in the same neighborhood.
-
-    Returns a list of candidate table descriptions.
+      - The addresses are spread out and mostly ascending.
+
+    For each stride the in-range test is evaluated for every offset at
+    once (two translate() passes and a map(add)), and runs of valid pairs
+    are found with a regex, so the scan is linear in the file size per
+    stride. A run longer than the stride is cut to the stride-sized window
+    with the most ascending steps.
+
+    Candidates are ranked by ascending steps; a candidate whose lo or hi
+    table overlaps a better one's is dropped, which removes the pairings
+    of a real hi table with whatever bytes happen to sit before it.
+    Survivors with fewer than `min_ascending` of their steps ascending
+    are then dropped as chance runs of in-range bytes.
+    Returns a list of candidate table descriptions, best first.
     """
     file_size = len(data)
-    addr_hi = base_addr + file_size
+    lo_flags, hi_class, verdict = _pointer_masks(base_addr, file_size)
+    lo_mask = data.translate(lo_flags)
+    hi_mask = data.translate(hi_class)
+    run = re.compile(rb'\x01{%d,}' % min_count)
+
+    found = []
+    for stride in range(min_count, min(max_count, file_size // 2) + 1):
+        valid = bytes(map(add, lo_mask[:file_size - stride], hi_mask[stride:]))
+        for m in run.finditer(valid.translate(verdict)):
+            start, length = m.start(), m.end() - m.start()
+            addrs = [lo | (hi << 8) for lo, hi in
+                     zip(data[start:start + length], data[start + stride:start + stride + length])]
+            steps = [0] + list(accumulate(a < b for a, b in zip(addrs, addrs[1:])))
+            count = min(length, stride)
+            # Best window of `count` entries by ascending steps (prefix sums)
+            shift = max(range(length - count + 1),
+                        key=lambda k: steps[k + count - 1] - steps[k])
+            addrs = addrs[shift:shift + count]
+            ordered = steps[shift + count - 1] - steps[shift]
+
+            # Check that addresses are reasonably spread (not all identical)
+            if len(set(addrs)) < max(2, count // 2):
+                continue
+            addr_range = max(addrs) - min(addrs)
+            if addr_range < count * 2:
+                continue
+            found.append((ordered, count, start + shift, stride, addrs))
+
     candidates = []
+    claimed = bytearray(file_size)
+    for ordered, count, lo_start, stride, addrs in sorted(found, key=lambda c: (-c[0], -c[1], c[2])):
+        hi_start = lo_start + stride
+        if any(claimed[lo_start:lo_start + count]) or any(claimed[hi_start:hi_start + count]):
+            continue
+        claimed[lo_start:lo_start + count] = b'\x01' * count
+        claimed[hi_start:hi_start + count] = b'\x01' * count
+        if ordered < min_ascending * (count - 1):
+            continue
+        candidates.append({
+            'ptr_lo': lo_start,
+            'ptr_hi': hi_start,
+            'count': count,
+            'ordered': ordered,
+            'addr_min': min(addrs),
+            'addr_max': max(addrs),
+            # Addresses monotonically non-decreasing (common pattern)
+            'monotonic': all(a <= b for a, b in zip(addrs, addrs[1:])),
+        })
 
-    # Scan every byte offset as a potential ptr_lo table start
-    for lo_start in range(0, file_size - min_count):
-        # Try the matching hi table at several common relative positions:
-        # immediately after (lo_start + count), or at a fixed stride
-        for count in range(min_count, min(max_count + 1, file_size - lo_start)):
-            hi_start = lo_start + count  # hi table right after lo table
-            if hi_start + count > file_size:
-                break
+    return candidates
 
-            valid = True
-            addrs = []
-            for i in range(count):
-                lo = data[lo_start + i]
-                hi = data[hi_start + i]
-                addr = lo | (hi << 8)
-                if addr < base_addr or addr >= addr_hi:
-                    valid = False
-                    break
-                addrs.append(addr)
 
-            if not valid:
-                continue
+SIZE_TABLE_MAX_WIDTH = 40   # an HGR row is 40 bytes
 
-            # Check that addresses are reasonably spread (not all identical)
-            unique_addrs = set(addrs)
-            if len(unique_addrs) < max(2, count // 2):
-                continue
 
-            # Check that addresses are monotonically non-decreasing (common pattern)
-            monotonic = all(addrs[j] <= addrs[j + 1] for j in range(len(addrs) - 1))
+def table_addresses(data, ptr_lo, ptr_hi, count):
+    """Return the addresses held by a lo/hi pointer table pair."""
+    return [lo | (hi << 8) for lo, hi in zip(data[ptr_lo:ptr_lo + count],
+                                             data[ptr_hi:ptr_hi + count])]
 
-            # Only report candidates with enough sprites and some spread
-            addr_range = max(addrs) - min(addrs)
-            if addr_range < count * 2:
-                continue
 
-            candidates.append({
-                'ptr_lo': lo_start,
-                'ptr_hi': hi_start,
-                'count': count,
-                'addr_min': min(addrs),
-                'addr_max': max(addrs),
-                'monotonic': monotonic,
-            })
+def _sprite_gaps(addrs):
+    """Bytes from each address to the next higher one (None for the highest)."""
+    distinct = sorted(set(addrs))
+    following = dict(zip(distinct, distinct[1:]))
+    return [following[a] - a if a in following else None for a in addrs]
 
-            # Don't report sub-ranges of the same table
-            break
 
-        # Limit output
-        if len(candidates) >= 20:
-            break
+def score_size_tables(data, base_addr, addrs, width_tbl, height_tbl):
+    """
+    Score a width/height table choice against a list of sprite addresses.
 
-    return candidates
+    Returns (tiled, overlap, zero): how many sprites end exactly where the
+    next sprite by address starts, how many bytes of the binary fall inside
+    more than one distinct sprite, and how many sprites have a zero size.
+    Coverage is counted with a difference array and a prefix sum over the
+    whole binary.
+    """
+    count = len(addrs)
+    sizes = list(map(mul, data[width_tbl:width_tbl + count],
+                     data[height_tbl:height_tbl + count]))
+    tiled = sum(1 for gap, size in zip(_sprite_gaps(addrs), sizes) if gap == size)
+
+    delta = [0] * (len(data) + 1)
+    for addr, size in set(zip(addrs, sizes)):
+        start = addr - base_addr
+        if 0 <= start < len(data):
+            delta[start] += 1
+            delta[min(start + size, len(data))] -= 1
+    overlap = sum(1 for depth in accumulate(delta) if depth > 1)
+    return tiled, overlap, sizes.count(0)
+
+
+def find_size_tables(data, base_addr, ptr_lo, ptr_hi, count, top=3):
+    """
+    Search the binary for the width and height tables of a pointer table pair.
+
+    The two tables are assumed to be `count` bytes each and either adjacent
+    or as far apart as the lo and hi tables. For each spacing, every byte
+    pair (data[x], data[x + spacing]) whose product equals the gap after
+    sprite i votes for a width table at x - i; the best-voted offsets are
+    then checked with score_size_tables. The table whose values fit in an
+    HGR row is taken as the width table.
+
+    Returns up to `top` dicts with width_tbl, height_tbl, tiled, overlap
+    and zero keys, best first.
+    """
+    size = len(data)
+    addrs = table_addresses(data, ptr_lo, ptr_hi, count)
+    wanted = {}
+    for i, gap in enumerate(_sprite_gaps(addrs)):
+        if gap:
+            wanted.setdefault(gap, []).append(i)
+
+    pointer_bytes = bytearray(size)
+    pointer_bytes[ptr_lo:ptr_lo + count] = b'\x01' * count
+    pointer_bytes[ptr_hi:ptr_hi + count] = b'\x01' * count
+
+    found = {}
+    for spacing in sorted({ptr_hi - ptr_lo, count}):
+        limit = size - spacing - count + 1      # first table must start below this
+        if limit <= 0:
+            continue
+        votes = [0] * limit
+        for p, product in enumerate(map(mul, data[:size - spacing], data[spacing:])):
+            for i in wanted.get(product, ()):
+                if 0 <= p - i < limit:
+                    votes[p - i] += 1
+
+        best = heapq.nlargest(top * 4, range(limit), key=votes.__getitem__)
+        for first in best:
+            second = first + spacing
+            if not votes[first] or any(pointer_bytes[first:first + count]) \
+                    or any(pointer_bytes[second:second + count]):
+                continue
+            if (max(data[first:first + count]) > SIZE_TABLE_MAX_WIDTH
+                    and max(data[second:second + count]) <= SIZE_TABLE_MAX_WIDTH):
+                first, second = second, first
+            tiled, overlap, zero = score_size_tables(data, base_addr, addrs, first, second)
+            found[(first, second)] = {
+                'width_tbl': first,
+                'height_tbl': second,
+                'tiled': tiled,
+                'overlap': overlap,
+                'zero': zero,
+            }
+
+    ranked = sorted(found.values(),
+                    key=lambda c: (-c['tiled'], c['overlap'], c['zero'], c['width_tbl']))
+    return ranked[:top]
 
 
 # ---------------------------------------------------------------------------
@@ -400,14 +1129,33 @@ examples:
 
   Auto-detect mode:
     %(prog)s game.bin --auto --base 0x4000
+
+  Full HGR screen (8 KB page dump or 64 KB memory snapshot):
+    %(prog)s snapshot.bin --screen --page 2
 """)
 
-    p.add_argument('binary', help='Path to the Apple II binary file')
+    p.add_argument('binary', nargs='?', help='Path to the Apple II binary file')
 
     # Mode selection
     mode = p.add_argument_group('extraction mode (pick one)')
     mode.add_argument('--auto', action='store_true',
                       help='Auto-detect potential sprite tables')
+    mode.add_argument('--screen', action='store_true',
+                      help='Render a full HGR screen from a page dump or '
+                           'memory snapshot')
+
+    # Auto-detect options
+    auto = p.add_argument_group('auto-detect')
+    auto.add_argument('--max-candidates', type=int, default=20, metavar='N',
+                      help='Show at most N pointer table candidates, best '
+                           'first (default: 20, 0 = all)')
+
+    # Screen mode options
+    screen = p.add_argument_group('screen rendering')
+    screen.add_argument('--page', type=int, choices=(1, 2), default=1,
+                        help='HGR page to take from a memory snapshot (default: 1)')
+    screen.add_argument('--screen-offset', type=parse_int, default=None,
+                        help='File offset of the HGR page (overrides --page)')
 
     # Manual mode options
     manual = p.add_argument_group('manual extraction')
@@ -439,10 +1187,22 @@ examples:
                         help='Scale factor for output PNGs (default: 4)')
     common.add_argument('--sheet', action='store_true',
                         help='Also generate a combined sprite sheet PNG')
+    common.add_argument('--atlas', action='store_true',
+                        help='Also pack all sprites into a compact atlas PNG '
+                             'with a JSON index of sprite positions')
     common.add_argument('--ascii', action='store_true',
                         help='Print ASCII art preview to terminal')
     common.add_argument('--output-dir', type=str, default='.',
                         help='Output directory for PNG files (default: current dir)')
+    common.add_argument('--shift-groups', action='store_true',
+                        help='Detect pre-shifted copies, verify them against the '
+                             'unshifted sprite and write one sprite per group')
+    common.add_argument('--jobs', type=int, default=1,
+                        help='Render and encode sprites in N worker processes '
+                             '(default: 1)')
+    common.add_argument('--self-check', action='store_true',
+                        help='Verify the NumPy renderer against the reference '
+                             'row renderer and exit')
 
     return p
 
@@ -455,6 +1215,21 @@ def main():
     parser = build_parser()
     args = parser.parse_args()
 
+    if args.self_check:
+        try:
+            failures = check_batch_renderer()
+        except ImportError:
+            print("NumPy not installed: only the lookup-table renderer is used.")
+            sys.exit(0)
+        for failure in failures[:10]:
+            print("MISMATCH: %s" % failure)
+        print("NumPy renderer %s" % ("FAILED (%d rows)" % len(failures)
+                                     if failures else "matches render_hgr_row"))
+        sys.exit(1 if failures else 0)
+
+    if args.binary is None:
+        parser.error('the following arguments are required: binary')
+
     # Load binary
     binary_path = Path(args.binary)
     if not binary_path.is_file():
@@ -472,6 +1247,20 @@ def main():
     is_manual = (args.offset is not None and args.width is not None
                  and args.height is not None)
 
+    if args.screen:
+        try:
+            page_view = hgr_page_from_dump(data, args.page, args.screen_offset)
+        except ValueError as exc:
+            print("Error: %s" % exc, file=sys.stderr)
+            sys.exit(1)
+        pixels, px_w, px_h = render_hgr_screens([page_view])[0]
+        out_dir = Path(args.output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out_path = out_dir / ("%s_hgr.png" % binary_path.stem)
+        write_png(str(out_path), pixels, px_w, px_h, scale=args.scale)
+        print("  Wrote %s (%d x %d)" % (out_path, px_w * args.scale, px_h * args.scale))
+        return
+
     if args.auto:
         # Auto-detect mode
         print("\nScanning for sprite table candidates (base=$%04X)..." % args.base)
@@ -480,16 +1269,42 @@ def main():
             print("No sprite table candidates found.")
             sys.exit(0)
 
-        print("\nFound %d candidate(s):\n" % len(candidates))
-        for idx, c in enumerate(candidates):
+        shown = candidates
+        if args.max_candidates > 0:
+            shown = candidates[:args.max_candidates]
+        if len(shown) < len(candidates):
+            print("\nFound %d candidate(s), showing the best %d "
+                  "(--max-candidates 0 shows all):\n" % (len(candidates), len(shown)))
+        else:
+            print("\nFound %d candidate(s):\n" % len(candidates))
+        for idx, c in enumerate(shown):
             mono = " (monotonic)" if c['monotonic'] else ""
-            print("  [%2d] ptr_lo=$%04X  ptr_hi=$%04X  count=%d  "
-                  "addr_range=$%04X..$%04X%s"
-                  % (idx, c['ptr_lo'], c['ptr_hi'], c['count'],
-                     c['addr_min'], c['addr_max'], mono))
+            print("  [%2d] ptr_lo=$%04X  ptr_hi=$%04X (+$%02X)  count=%d  "
+                  "ascending=%d  addr_range=$%04X..$%04X%s"
+                  % (idx, c['ptr_lo'], c['ptr_hi'], c['ptr_hi'] - c['ptr_lo'], c['count'],
+                     c['ordered'], c['addr_min'], c['addr_max'], mono))
+
+        # Width/height tables whose sizes tile the pointed-to data; each
+        # search scans the whole binary, so only the shown candidates
+        configs = []
+        for c in shown:
+            for t in find_size_tables(data, args.base, c['ptr_lo'], c['ptr_hi'], c['count'], top=1):
+                if t['tiled'] * 4 >= c['count'] * 3 and not t['overlap']:
+                    configs.append((c, t))
+
+        if not configs:
+            print("\nNo width/height tables found; to extract, re-run with "
+                  "--ptr-lo, --ptr-hi, --width-tbl, --height-tbl, and --count.")
+            sys.exit(0)
 
-        print("\nTo extract, re-run with --ptr-lo, --ptr-hi, --width-tbl, "
-              "--height-tbl, and --count.")
+        print("\nTable configuration(s) (width * height tiles the sprite data):\n")
+        for c, t in configs:
+            print("  # %d of %d sprites tile exactly, no overlapping bytes"
+                  % (t['tiled'], c['count']))
+            print("  %s %s --ptr-lo 0x%04X --ptr-hi 0x%04X --width-tbl 0x%04X "
+                  "--height-tbl 0x%04X --count %d --base 0x%04X\n"
+                  % (sys.argv[0], binary_path, c['ptr_lo'], c['ptr_hi'],
+                     t['width_tbl'], t['height_tbl'], c['count'], args.base))
         sys.exit(0)
 
     elif is_table:
@@ -527,39 +1342,56 @@ def main():
         print("No sprites extracted.")
         sys.exit(1)
 
+    # Keep one canonical sprite per pre-shifted group
+    indices, groups = None, None
+    if args.shift_groups:
+        groups = find_shift_groups(raw_sprites)
+        print("\n" + shift_group_report(raw_sprites, groups))
+        indices, raw_sprites = canonical_sprites(raw_sprites, groups)
+
     # Render sprites
     print("\nRendering %d sprite(s) at %dx scale..." % (len(raw_sprites), args.scale))
 
     out_dir = Path(args.output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    rendered = []  # (pixels, width, height) at 1x for sheet/ascii
-    for i, (sprite_data, w_bytes, h) in enumerate(raw_sprites):
-        pixels, px_w, px_h = render_sprite(sprite_data, w_bytes, h)
-        rendered.append((pixels, px_w, px_h))
+    # Render and write PNGs (scaled while encoding), in a pool with --jobs
+    rendered, paths = write_sprites(raw_sprites, out_dir, args.scale, args.jobs, indices)
+    for i, (pixels, px_w, px_h), out_path in zip(indices or range(len(rendered)),
+                                                  rendered, paths):
 
         # ASCII preview (always at 1x)
         if args.ascii:
             print("\n--- Sprite %d (%d x %d px) ---" % (i, px_w, px_h))
             print(ascii_preview(pixels, px_w, px_h))
 
-        # Save scaled PNG
-        scaled_px, scaled_w, scaled_h = scale_pixels(pixels, px_w, px_h, args.scale)
-        out_path = out_dir / ("sprite_%02d.png" % i)
-        write_png(str(out_path), scaled_px, scaled_w, scaled_h)
-        print("  Wrote %s (%d x %d)" % (out_path, scaled_w, scaled_h))
+        print("  Wrote %s (%d x %d)" % (out_path, px_w * args.scale, px_h * args.scale))
 
     # Sprite sheet
+    sheet = None
     if args.sheet and rendered:
         # Build sheet at 1x, then scale
         sheet_px, sheet_w, sheet_h = build_sprite_sheet(rendered, padding=2)
         if sheet_w > 0 and sheet_h > 0:
-            scaled_px, scaled_w, scaled_h = scale_pixels(
-                sheet_px, sheet_w, sheet_h, args.scale
-            )
             sheet_path = out_dir / "sprite_sheet.png"
-            write_png(str(sheet_path), scaled_px, scaled_w, scaled_h)
-            print("\n  Wrote sprite sheet: %s (%d x %d)" % (sheet_path, scaled_w, scaled_h))
+            write_png(str(sheet_path), sheet_px, sheet_w, sheet_h, scale=args.scale)
+            sheet = (sheet_path, sheet_w, sheet_h)
+            print("\n  Wrote sprite sheet: %s (%d x %d)"
+                  % (sheet_path, sheet_w * args.scale, sheet_h * args.scale))
+
+    # Packed atlas with a JSON index of sprite rectangles
+    if args.atlas and rendered:
+        atlas_px, atlas_w, atlas_h, positions = build_sprite_atlas(rendered, padding=2)
+        atlas_path = out_dir / "sprite_atlas.png"
+        write_png(str(atlas_path), atlas_px, atlas_w, atlas_h, scale=args.scale)
+        write_atlas_index(out_dir / "sprite_atlas.json", atlas_path, args.scale,
+                          rendered, positions, indices)
+        print("  Wrote sprite atlas: %s (%d x %d) + sprite_atlas.json"
+              % (atlas_path, atlas_w * args.scale, atlas_h * args.scale))
+
+    manifest_path = write_manifest(out_dir, binary_path.name, args.scale,
+                                   raw_sprites, rendered, paths, sheet, indices, groups)
+    print("  Wrote manifest: %s" % manifest_path)
 
     print("\nDone.")
 
@@ -10,8 +10,17 @@ Cowritten by Claude Code Opus 4.6
 
 import sys
 import argparse
+import base64
+import difflib
+import heapq
 import html as html_module
-from collections import defaultdict
+import json
+import operator
+import re
+from array import array
+from bisect import bisect_right, insort
+from collections import deque
+from itertools import accumulate
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -132,10 +141,28 @@ RMW_MNEMONICS = {
     "ASL", "DEC", "INC", "LSR", "ROL", "ROR",
 }
 
+# Base cycle counts by addressing mode, and per-instruction overrides
+MODE_CYCLES = {
+    "imp": 2, "acc": 2, "imm": 2, "rel": 2, "zp": 3, "zpx": 4, "zpy": 4,
+    "abs": 4, "absx": 4, "absy": 4, "indx": 6, "indy": 5, "ind": 5,
+}
+FIXED_CYCLES = {
+    "JSR": 6, "RTS": 6, "RTI": 6, "BRK": 7, "PHA": 3, "PHP": 3,
+    "PLA": 4, "PLP": 4,
+}
+RMW_CYCLES = {"acc": 2, "zp": 5, "zpx": 6, "abs": 6, "absx": 7}
+STORE_CYCLES = {"absx": 5, "absy": 5, "indy": 6}
+
 # Branch / jump mnemonics
 BRANCH_MNEMONICS = {"BCC", "BCS", "BEQ", "BMI", "BNE", "BPL", "BVC", "BVS"}
 UNCONDITIONAL_FLOW = {"JMP", "RTS", "RTI", "BRK"}
 
+# Stack bytes pushed / pulled per instruction (SP itself is not tracked)
+STACK_EFFECT = {
+    "PHA": (1, 0), "PHP": (1, 0), "JSR": (2, 0), "BRK": (3, 0),
+    "PLA": (0, 1), "PLP": (0, 1), "RTS": (0, 2), "RTI": (0, 3),
+}
+
 # ---------------------------------------------------------------------------
 # Apple II hardware addresses (expanded from disasm6502.py)
 # ---------------------------------------------------------------------------
@@ -212,6 +239,25 @@ HARDWARE = {
     0xC005: "WRCARDRAM",
 }
 
+# Apple II memory areas for the whole-address-space page map
+MEMORY_AREAS = [
+    (0x0000, 0x00FF, "Zero page"),
+    (0x0100, 0x01FF, "Stack"),
+    (0x0200, 0x03FF, "Input buffer / vectors"),
+    (0x0400, 0x07FF, "Text/lo-res page 1"),
+    (0x0800, 0x0BFF, "Text/lo-res page 2"),
+    (0x0C00, 0x1FFF, "Free RAM"),
+    (0x2000, 0x3FFF, "HGR page 1"),
+    (0x4000, 0x5FFF, "HGR page 2"),
+    (0x6000, 0xBFFF, "Free RAM"),
+    (0xC000, 0xC0FF, "I/O soft switches"),
+    (0xC100, 0xCFFF, "Slot ROM"),
+    (0xD000, 0xDFFF, "ROM / LC bank 1|2"),
+    (0xE000, 0xFFFF, "ROM / LC RAM"),
+]
+
+LC_SWITCHES = range(0xC080, 0xC090)
+
 # Well-known zero-page locations on Apple II
 ZP_NAMES = {
     0x00: "LOMEM (BASIC)",
@@ -255,20 +301,80 @@ ZP_NAMES = {
 
 
 # ---------------------------------------------------------------------------
-# Per-address access record
+# Columnar access counters
 # ---------------------------------------------------------------------------
+ADDR_SPACE = 0x10000
+
+# Per-address flag bits in AccessCounters.flags
+FLAG_CODE = 0x01
+FLAG_READ = 0x02
+FLAG_WRITE = 0x04
+
+
+class AccessCounters:
+    """Fixed-size counters for the whole 6502 address space.
+
+    Read, write and exec counts are three 65,536-entry ``array('I')``
+    columns and per-address flags live in one ``bytearray``, so memory is
+    bounded no matter how many accesses are recorded.  Caller edges are
+    deduplicated on insert, one packed ``target << 16 | source`` int per
+    distinct edge, so a traced loop that repeats a call costs nothing more.
+    They are compacted on demand into a CSR-style index:
+    ``caller_offsets[a]:caller_offsets[a + 1]`` slices ``caller_sources``
+    to give the distinct callers of address *a*.
+    """
+
+    def __init__(self):
+        self.reads = array("I", [0]) * ADDR_SPACE
+        self.writes = array("I", [0]) * ADDR_SPACE
+        self.execs = array("I", [0]) * ADDR_SPACE
+        self.flags = bytearray(ADDR_SPACE)
+        self._edges = set()
+        self._csr = None
+
+    def add_edge(self, target, source):
+        edge = (target << 16) | source
+        if edge not in self._edges:
+            self._edges.add(edge)
+            self._csr = None
+
+    def caller_index(self):
+        """Return (offsets, sources), building the CSR index if stale."""
+        if self._csr is None:
+            edges = sorted(self._edges)
+            counts = array("I", [0]) * (ADDR_SPACE + 1)
+            for edge in edges:
+                counts[(edge >> 16) + 1] += 1
+            for a in range(ADDR_SPACE):
+                counts[a + 1] += counts[a]
+            self._csr = (counts, array("H", [edge & 0xFFFF for edge in edges]))
+        return self._csr
+
+    def callers_of(self, addr):
+        offsets, sources = self.caller_index()
+        return sources[offsets[addr]:offsets[addr + 1]]
+
+    def callers_in(self, start, end):
+        """Distinct callers referencing any address in start..end."""
+        offsets, sources = self.caller_index()
+        return set(sources[offsets[start]:offsets[end + 1]])
+
+    def touched(self):
+        """True once anything has been recorded."""
+        return any(self.flags)
+
+
 class AddrInfo:
-    """Tracks access counts and metadata for a single address."""
+    """Read-only view of the counters for a single address."""
     __slots__ = ("read_count", "write_count", "exec_count",
-                 "is_code", "callers", "notes")
+                 "is_code", "callers")
 
-    def __init__(self):
-        self.read_count = 0
-        self.write_count = 0
-        self.exec_count = 0
-        self.is_code = False
-        self.callers = set()   # addresses that reference this location
-        self.notes = []
+    def __init__(self, counters, addr):
+        self.read_count = counters.reads[addr]
+        self.write_count = counters.writes[addr]
+        self.exec_count = counters.execs[addr]
+        self.is_code = bool(counters.flags[addr] & FLAG_CODE)
+        self.callers = counters.callers_of(addr)
 
     @property
     def total(self):
@@ -287,6 +393,104 @@ class AddrInfo:
         return r + w if (r or w) else "-"
 
 
+# flags byte -> type code, applied to whole ranges with bytes.translate()
+TYPE_UNKNOWN, TYPE_DATA, TYPE_CODE = 0, 1, 2
+_TYPE_NAMES = ("unknown", "data", "code")
+_TYPE_OF_FLAGS = bytes(
+    TYPE_CODE if f & FLAG_CODE else
+    TYPE_DATA if f & (FLAG_READ | FLAG_WRITE) else TYPE_UNKNOWN
+    for f in range(256))
+_TYPE_RUN = re.compile(b"\x00+|\x01+|\x02+")
+
+
+# ---------------------------------------------------------------------------
+# Per-frame profiling (dynamic traces)
+# ---------------------------------------------------------------------------
+# NTSC Apple II: 1.0205 MHz / 59.94 Hz
+CYCLES_PER_FRAME = 17030
+
+TRACE_LINE = re.compile(
+    r"^\s*(?:PC[=:]\s*)?\$?([0-9A-Fa-f]{4})\b:?((?:\s+[0-9A-Fa-f]{2}\b){0,3})")
+TRACE_REG = re.compile(r"\b([XY])[=:]\$?([0-9A-Fa-f]{2})\b")
+
+
+def base_cycles(mnem, mode):
+    """Cycle count of an instruction before page-cross/branch penalties."""
+    if mnem in FIXED_CYCLES:
+        return FIXED_CYCLES[mnem]
+    if mnem == "JMP":
+        return 3 if mode == "abs" else 5
+    if mnem in RMW_MNEMONICS:
+        return RMW_CYCLES.get(mode, 2)
+    if mnem in WRITE_MNEMONICS:
+        return STORE_CYCLES.get(mode, MODE_CYCLES[mode])
+    return MODE_CYCLES[mode]
+
+
+# Pointer dataflow bounds: values tracked per location, visits per block
+POINTER_VALUES = 64
+POINTER_VISITS = 8
+
+
+def _join_states(a, b):
+    """Join two abstract states: union the value sets both sides know."""
+    joined = {}
+    for key, va in a.items():
+        vb = b.get(key)
+        if va is None or vb is None:
+            continue
+        union = va | vb
+        if len(union) <= POINTER_VALUES:
+            joined[key] = union
+    return joined
+
+
+def _merge_ranges(ranges):
+    """Coalesce overlapping or adjacent (first, last) ranges."""
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def area_name(addr):
+    """Name of the MEMORY_AREAS entry containing *addr*."""
+    for start, end, name in MEMORY_AREAS:
+        if start <= addr <= end:
+            return name
+    return "?"
+
+
+# Pattern detectors: longest loop body considered, and the static
+# weight given to RMW instructions inside a loop
+LOOP_MAX_BODY = 64
+LOOP_WEIGHT = 8
+
+# Input soft switches that code spins on (keyboard, buttons, paddles)
+POLLED_SWITCHES = {0xC000, 0xC061, 0xC062, 0xC063,
+                   0xC064, 0xC065, 0xC066, 0xC067}
+
+
+class FrameProfile:
+    """Counters for one frame of a dynamic trace."""
+    __slots__ = ("index", "cycles", "instructions", "reads", "writes",
+                 "routines")
+
+    def __init__(self, index):
+        self.index = index
+        self.cycles = 0
+        self.instructions = 0
+        self.reads = 0
+        self.writes = 0
+        self.routines = {}   # routine entry -> cycles spent in it
+
+    def top_routines(self, n=5):
+        return sorted(self.routines.items(), key=lambda x: (-x[1], x[0]))[:n]
+
+
 # ---------------------------------------------------------------------------
 # Core analysis engine
 # ---------------------------------------------------------------------------
@@ -297,9 +501,12 @@ class MemoryAnalyzer:
         self.code = code
         self.load_addr = load_addr
         self.end_addr = load_addr + len(code) - 1
-        self.info = defaultdict(AddrInfo)
+        self.counters = AccessCounters()
         self.subroutines = set()    # JSR targets
         self.branch_targets = set()
+        self.stack_pushes = 0       # bytes pushed (PHA/PHP/JSR/BRK)
+        self.stack_pulls = 0        # bytes pulled (PLA/PLP/RTS/RTI)
+        self.pointer_targets = {}   # pc -> (mnem, mode, zp, ranges)
 
     # -- helpers -----------------------------------------------------------
 
@@ -310,28 +517,45 @@ class MemoryAnalyzer:
             return off
         return -1
 
+    def addr_info(self, addr):
+        """Return an AddrInfo view of the counters at *addr*."""
+        return AddrInfo(self.counters, addr)
+
+    def type_codes(self, start, end):
+        """Type code (TYPE_*) per address in start..end, as bytes."""
+        return self.counters.flags[start:end + 1].translate(_TYPE_OF_FLAGS)
+
     def _record_exec(self, addr, size):
         """Mark *size* bytes starting at *addr* as executed code."""
+        c = self.counters
         for a in range(addr, addr + size):
-            info = self.info[a]
-            info.exec_count += 1
-            info.is_code = True
+            a &= 0xFFFF
+            c.execs[a] += 1
+            c.flags[a] |= FLAG_CODE
+
+    def _record_stack(self, mnem):
+        push, pull = STACK_EFFECT.get(mnem, (0, 0))
+        self.stack_pushes += push
+        self.stack_pulls += pull
 
     def _record_read(self, target_addr, from_addr):
-        info = self.info[target_addr]
-        info.read_count += 1
-        info.callers.add(from_addr)
+        c = self.counters
+        c.reads[target_addr] += 1
+        c.flags[target_addr] |= FLAG_READ
+        c.add_edge(target_addr, from_addr)
 
     def _record_write(self, target_addr, from_addr):
-        info = self.info[target_addr]
-        info.write_count += 1
-        info.callers.add(from_addr)
+        c = self.counters
+        c.writes[target_addr] += 1
+        c.flags[target_addr] |= FLAG_WRITE
+        c.add_edge(target_addr, from_addr)
 
     def _record_rmw(self, target_addr, from_addr):
-        info = self.info[target_addr]
-        info.read_count += 1
-        info.write_count += 1
-        info.callers.add(from_addr)
+        c = self.counters
+        c.reads[target_addr] += 1
+        c.writes[target_addr] += 1
+        c.flags[target_addr] |= FLAG_READ | FLAG_WRITE
+        c.add_edge(target_addr, from_addr)
 
     # -- operand target resolution ----------------------------------------
 
@@ -381,6 +605,7 @@ class MemoryAnalyzer:
 
             # Mark instruction bytes as executed
             self._record_exec(pc, size)
+            self._record_stack(mnem)
 
             # Decode operand
             if size == 2:
@@ -456,6 +681,7 @@ class MemoryAnalyzer:
 
                 # Mark as executed
                 self._record_exec(pc, size)
+                self._record_stack(mnem)
 
                 # Decode operand
                 if size == 2:
@@ -511,66 +737,557 @@ class MemoryAnalyzer:
 
                 pc += size
 
-    # -- region detection --------------------------------------------------
+    # -- zero-page pointer dataflow ----------------------------------------
+
+    def analyze_pointers(self, entry):
+        """Resolve (zp),Y and (zp,X) targets by propagating constants.
+
+        Abstract state maps A/X/Y and zero-page bytes to a set of possible
+        values (None = unknown).  Immediates, loads from tables in the
+        image, stores, transfers and INC/DEC are tracked; everything else
+        makes its destination unknown.  States are joined at block starts
+        and each block is revisited at most POINTER_VISITS times; after
+        that, locations still changing are widened to unknown and the block
+        is processed once more, so loops that step a pointer end up
+        unresolved rather than stuck at the first few iterations.  Zero
+        page is unknown after a JSR, since the callee may rewrite it.
+        Resolved base addresses are
+        recorded as accesses and the target ranges are stored in
+        ``self.pointer_targets`` as {pc: (mnem, mode, zp, [(lo, hi), ...])}.
+        """
+        self.pointer_targets = {}
+        in_states = {entry: {}}
+        visits = {}
+        worklist = deque([entry])
 
-    def build_regions(self):
-        """Return sorted list of (start, end, type, details) regions."""
-        if not self.info:
-            return []
+        while worklist:
+            start = worklist.popleft()
+            visits[start] = visits.get(start, 0) + 1
+            state = dict(in_states[start])
+            pc = start
+            successors = []
+            while True:
+                off = self._addr_to_offset(pc)
+                if off < 0 or self.code[off] not in OPCODES:
+                    break
+                mnem, mode, size = OPCODES[self.code[off]]
+                if off + size > len(self.code):
+                    break
+                operand = None
+                if size == 2:
+                    operand = self.code[off + 1]
+                elif size == 3:
+                    operand = self.code[off + 1] | (self.code[off + 2] << 8)
 
-        # Gather all addresses in the binary range that have info
-        addrs = set()
-        for a in range(self.load_addr, self.end_addr + 1):
-            addrs.add(a)
+                if mode in ("indx", "indy"):
+                    self._resolve_indirect(pc, mnem, mode, operand, state)
+                self._pointer_transfer(mnem, mode, operand, state)
 
-        regions = []
-        sorted_addrs = sorted(addrs)
-        if not sorted_addrs:
-            return regions
+                if mode == "rel":
+                    successors.append((pc + 2 + (operand - 256 if operand >= 128
+                                                 else operand)) & 0xFFFF)
+                    successors.append(pc + size)
+                    break
+                if mnem == "JSR":
+                    # Callee sees the pointers set up by the caller; on
+                    # return registers and zero page are unknown.
+                    successors.append(operand)
+                    successors.append((pc + size, {}))
+                    break
+                if mnem == "JMP":
+                    if mode == "abs":
+                        successors.append(operand)
+                    break
+                if mnem in ("RTS", "RTI", "BRK"):
+                    break
+                pc += size
 
-        cur_start = sorted_addrs[0]
-        cur_type = self.info[cur_start].type_str()
+            for succ in successors:
+                out = state
+                if isinstance(succ, tuple):
+                    succ, out = succ
+                old = in_states.get(succ)
+                new = out if old is None else _join_states(old, out)
+                if old is None or new != old:
+                    if visits.get(succ, 0) >= POINTER_VISITS:
+                        # Widen: drop every location that is still
+                        # changing.  Each widening removes keys, so this
+                        # terminates.
+                        new = {k: v for k, v in old.items() if new.get(k) == v}
+                    in_states[succ] = new
+                    worklist.append(succ)
+
+        # Record accesses only once the states are final, so guesses from
+        # early, narrower visits do not leave stray counts behind
+        for pc, (mnem, mode, zp, ranges) in self.pointer_targets.items():
+            for first, _ in ranges:
+                if mnem in WRITE_MNEMONICS:
+                    self._record_write(first, pc)
+                elif mnem in RMW_MNEMONICS:
+                    self._record_rmw(first, pc)
+                else:
+                    self._record_read(first, pc)
+        return self.pointer_targets
+
+    def _pointer_transfer(self, mnem, mode, operand, state):
+        """Apply one instruction to the abstract register/ZP state."""
+        dest = {"LDA": "A", "LDX": "X", "LDY": "Y"}.get(mnem)
+        if dest:
+            if mode == "imm":
+                state[dest] = frozenset((operand,))
+            elif mode == "zp" and operand in state:
+                state[dest] = state[operand]
+            elif mode in ("absx", "absy", "abs"):
+                state[dest] = self._table_values(operand, mode != "abs")
+            else:
+                state.pop(dest, None)
+            return
+        src = {"STA": "A", "STX": "X", "STY": "Y"}.get(mnem)
+        if src:
+            if mode == "zp":
+                if src in state:
+                    state[operand] = state[src]
+                else:
+                    state.pop(operand, None)
+            elif mode in ("zpx", "zpy"):
+                # Unknown index: any ZP byte may have changed
+                for key in [k for k in state if isinstance(k, int)]:
+                    del state[key]
+            return
+        transfer = {"TAX": ("A", "X"), "TAY": ("A", "Y"), "TXA": ("X", "A"),
+                    "TYA": ("Y", "A")}.get(mnem)
+        if transfer:
+            if transfer[0] in state:
+                state[transfer[1]] = state[transfer[0]]
+            else:
+                state.pop(transfer[1], None)
+            return
+        step = {"INC": 1, "DEC": -1, "INX": 1, "DEX": -1, "INY": 1, "DEY": -1}.get(mnem)
+        if step:
+            key = {"INX": "X", "DEX": "X", "INY": "Y", "DEY": "Y"}.get(mnem)
+            if key is None:
+                key = operand if mode == "zp" else None
+            if key is not None and key in state:
+                state[key] = frozenset((v + step) & 0xFF for v in state[key])
+            elif mode in ("zpx",):
+                for k in [k for k in state if isinstance(k, int)]:
+                    del state[k]
+            return
+        if mnem in RMW_MNEMONICS and mode == "zp":
+            state.pop(operand, None)
+        elif mnem in RMW_MNEMONICS and mode == "acc":
+            state.pop("A", None)
+        elif mnem in ("ADC", "SBC", "AND", "ORA", "EOR", "PLA"):
+            state.pop("A", None)
+        elif mnem == "TSX":
+            state.pop("X", None)
+
+    def _table_values(self, base, indexed):
+        """Possible values loaded from *base* (a table if *indexed*).
+
+        Table length is unknown, so values are taken up to the first code
+        byte or 256 entries, whichever comes first.  A single byte is only
+        trusted if no store in the analysis writes it (it is a constant,
+        not a variable that merely starts out with that value).
+        """
+        off = self._addr_to_offset(base)
+        if off < 0:
+            return None
+        flags = self.counters.flags
+        if not indexed:
+            if flags[base] & FLAG_WRITE:
+                return None
+            return frozenset((self.code[off],))
+        values = set()
+        for i in range(off, min(len(self.code), off + 256)):
+            if flags[(self.load_addr + i) & 0xFFFF] & FLAG_CODE:
+                break
+            values.add(self.code[i])
+        if not values or len(values) > POINTER_VALUES:
+            return None
+        return frozenset(values)
+
+    def _resolve_indirect(self, pc, mnem, mode, zp, state):
+        """Attribute an indirect access through the pointer at *zp*."""
+        if mode == "indx":
+            x = state.get("X")
+            if x is None or len(x) != 1:
+                return
+            zp = (zp + next(iter(x))) & 0xFF
+        lo, hi = state.get(zp), state.get((zp + 1) & 0xFF)
+        if hi is None:
+            # Unknown (possibly after widening): drop any earlier guess
+            self.pointer_targets.pop(pc, None)
+            return
+        index = state.get("Y") if mode == "indy" else frozenset((0,))
+        ranges = []
+        for h in sorted(hi):
+            if lo is None:
+                first, last = h << 8, (h << 8) + 0xFF
+            else:
+                first, last = (h << 8) + min(lo), (h << 8) + max(lo)
+            if mode == "indy":
+                last += 0xFF if index is None else max(index)
+                if index is not None:
+                    first += min(index)
+            ranges.append((first & 0xFFFF, min(last, 0xFFFF)))
+        self.pointer_targets[pc] = (mnem, mode, zp, _merge_ranges(ranges))
+
+    # -- dynamic trace replay ----------------------------------------------
+
+    def analyze_trace(self, lines, frame_pc=None, frame_write=None,
+                      frame_access=None, keep=600):
+        """Replay an execution trace, one executed instruction per line.
+
+        Each line starts with the PC in hex (``5875``, ``$5875:`` or
+        ``PC=5875``), optionally followed by the instruction bytes and
+        ``X=..``/``Y=..`` register values; without bytes the instruction
+        is decoded from the loaded image.  Counts go into the normal
+        counters.  A new frame starts whenever execution reaches
+        *frame_pc*, an instruction writes *frame_write*, or an instruction
+        reads or writes *frame_access* (soft switches such as $C054/$C055
+        toggle on reads); the last *keep* frames are kept in a ring buffer,
+        which is returned.
+        """
+        frames = deque(maxlen=keep)
+        routines = sorted(self.subroutines)
+        frame = FrameProfile(0)
+        prev = None   # (pc, size, mnem) of the previous instruction
+
+        for line in lines:
+            m = TRACE_LINE.match(line)
+            if not m:
+                continue
+            pc = int(m.group(1), 16)
+            raw = bytes(int(t, 16) for t in m.group(2).split())
+            if not raw:
+                off = self._addr_to_offset(pc)
+                if off < 0:
+                    continue
+                raw = self.code[off:off + 3]
+            if raw[0] not in OPCODES:
+                continue
+            mnem, mode, size = OPCODES[raw[0]]
+            if len(raw) < size:
+                off = self._addr_to_offset(pc)
+                if off < 0 or off + size > len(self.code):
+                    continue
+                raw = self.code[off:off + size]
+            regs = {r: int(v, 16) for r, v in TRACE_REG.findall(line)}
 
-        for a in sorted_addrs[1:]:
-            t = self.info[a].type_str()
-            if t != cur_type:
-                regions.append((cur_start, a - 1, cur_type))
-                cur_start = a
-                cur_type = t
-        regions.append((cur_start, sorted_addrs[-1], cur_type))
-        return regions
+            # A taken branch costs one cycle more (two across a page)
+            if prev and prev[2] in BRANCH_MNEMONICS and pc != prev[0] + prev[1]:
+                extra = 2 if (pc & 0xFF00) != ((prev[0] + 2) & 0xFF00) else 1
+                frame.cycles += extra
+                self._charge(frame, routines, prev[0], extra)
+
+            if frame_pc is not None and pc == frame_pc and frame.instructions:
+                frames.append(frame)
+                frame = FrameProfile(frame.index + 1)
+
+            operand = None
+            if size == 2:
+                operand = raw[1]
+            elif size == 3:
+                operand = raw[1] | (raw[2] << 8)
+
+            self._record_exec(pc, size)
+            self._record_stack(mnem)
+            if mode == "rel":
+                self.branch_targets.add((pc + 2 + (operand - 256 if operand >= 128
+                                                   else operand)) & 0xFFFF)
+            elif mnem == "JSR" and operand not in self.subroutines:
+                self.subroutines.add(operand)
+                insort(routines, operand)
+
+            cycles = base_cycles(mnem, mode)
+            wrote = accessed = None
+            if operand is not None and mode not in ("imm", "rel", "acc", "imp"):
+                target, pointer = self._resolve_operand(mode, operand, pc)
+                if pointer is not None:
+                    self._record_read(pointer, pc)
+                    if pointer < 0x100:
+                        self._record_read(pointer + 1, pc)
+                if target is not None:
+                    index = regs.get("X" if mode in ("absx", "zpx") else "Y")
+                    if mode in ("absx", "absy") and index is not None:
+                        if mnem in READ_MNEMONICS and \
+                                (target & 0xFF) + index > 0xFF:
+                            cycles += 1
+                        target = (target + index) & 0xFFFF
+                    elif mode in ("zpx", "zpy") and index is not None:
+                        target = (target + index) & 0xFF
+                    if mnem not in ("JSR", "JMP"):
+                        accessed = target
+                    if mnem in WRITE_MNEMONICS:
+                        self._record_write(target, pc)
+                        frame.writes += 1
+                        wrote = target
+                    elif mnem in RMW_MNEMONICS:
+                        self._record_rmw(target, pc)
+                        frame.reads += 1
+                        frame.writes += 1
+                        wrote = target
+                    elif mnem not in ("JSR", "JMP"):
+                        self._record_read(target, pc)
+                        frame.reads += 1
+
+            frame.cycles += cycles
+            frame.instructions += 1
+            self._charge(frame, routines, pc, cycles)
+            prev = (pc, size, mnem)
+
+            if (frame_write is not None and wrote == frame_write) or \
+                    (frame_access is not None and accessed == frame_access):
+                frames.append(frame)
+                frame = FrameProfile(frame.index + 1)
+
+        if frame.instructions:
+            frames.append(frame)
+        return frames
+
+    @staticmethod
+    def _charge(frame, routines, pc, cycles):
+        """Attribute *cycles* to the nearest subroutine entry at or below pc."""
+        i = bisect_right(routines, pc)
+        owner = routines[i - 1] if i else pc & 0xFF00
+        frame.routines[owner] = frame.routines.get(owner, 0) + cycles
+
+    # -- access-pattern detectors ------------------------------------------
+
+    def _decode(self, addr):
+        """Return (mnem, mode, size, operand) at *addr*, or None."""
+        off = self._addr_to_offset(addr)
+        if off < 0 or self.code[off] not in OPCODES:
+            return None
+        mnem, mode, size = OPCODES[self.code[off]]
+        if off + size > len(self.code):
+            return None
+        operand = None
+        if size == 2:
+            operand = self.code[off + 1]
+        elif size == 3:
+            operand = self.code[off + 1] | (self.code[off + 2] << 8)
+        return mnem, mode, size, operand
+
+    def _instructions(self, start, end):
+        """Decode instructions linearly over start..end."""
+        pc = start
+        while pc <= end:
+            ins = self._decode(pc)
+            if ins is None:
+                return
+            yield (pc,) + ins
+            pc += ins[2]
+
+    def find_loops(self, max_body=LOOP_MAX_BODY):
+        """Return (head, tail, body) for tight backward branch/JMP loops.
+
+        *body* is the decoded instruction list head..tail; loops whose body
+        does not decode cleanly onto the back edge are skipped.
+        """
+        loops = []
+        for start, end, rtype in self.build_regions():
+            if rtype != "code":
+                continue
+            for pc, mnem, mode, size, operand in self._instructions(start, end):
+                if mode == "rel":
+                    target = (pc + 2 + (operand - 256 if operand >= 128
+                                        else operand)) & 0xFFFF
+                elif mnem == "JMP" and mode == "abs":
+                    target = operand
+                else:
+                    continue
+                if not 0 <= pc - target <= max_body:
+                    continue
+                body = list(self._instructions(target, pc))
+                if body and body[-1][0] == pc:
+                    loops.append((target, pc, body))
+        return loops
+
+    def find_patterns(self):
+        """Detect polling loops, strided table walks and RMW hot spots.
+
+        Returns a list of (cost, kind, start, end, detail) sorted by
+        estimated cycle cost: cycles per iteration (or per instruction)
+        weighted by the loop head's exec count, which is 1 for static
+        analysis and the real count after a trace replay.
+        """
+        execs = self.counters.execs
+        patterns = []
+        loop_pcs = set()
+
+        for head, tail, body in self.find_loops():
+            cycles = sum(base_cycles(m, mode) for _, m, mode, _, _ in body) + 1
+            weight = max(1, execs[head])
+            loop_pcs.update(pc for pc, _, _, _, _ in body)
+
+            switches = sorted({op for _, m, mode, _, op in body
+                               if mode == "abs" and 0xC000 <= op <= 0xC0FF})
+            if switches:
+                names = ", ".join(HARDWARE.get(a, "${:04X}".format(a))
+                                  for a in switches)
+                # Reading most soft switches has a side effect (SPKR
+                # toggles on any access); only input locations are polled
+                kind = "poll" if any(a in POLLED_SWITCHES for a in switches) \
+                    else "switch-loop"
+                patterns.append((cycles * weight, kind, head, tail,
+                                 "{} ({} cycles/iteration)".format(names, cycles)))
+
+            steps = {}
+            for _, m, mode, _, _ in body:
+                reg = {"INX": "X", "DEX": "X", "INY": "Y", "DEY": "Y"}.get(m)
+                if reg:
+                    steps[reg] = steps.get(reg, 0) + (1 if m[:2] == "IN" else -1)
+            walks = []
+            for _, m, mode, _, op in body:
+                reg = {"absx": "X", "zpx": "X", "absy": "Y", "zpy": "Y",
+                       "indy": "Y"}.get(mode)
+                if reg and steps.get(reg):
+                    target = "(${:02X}),Y".format(op) if mode == "indy" else \
+                        "${:04X}".format(op)
+                    walks.append("{} {} stride {:+d}".format(m, target, steps[reg]))
+            if walks:
+                patterns.append((cycles * weight, "strided", head, tail,
+                                 "; ".join(walks[:4]) +
+                                 " ({} cycles/iteration)".format(cycles)))
+
+        for start, end, rtype in self.build_regions():
+            if rtype != "code":
+                continue
+            for pc, mnem, mode, size, operand in self._instructions(start, end):
+                if mnem in RMW_MNEMONICS and mode != "acc":
+                    cycles = base_cycles(mnem, mode)
+                    in_loop = pc in loop_pcs
+                    weight = max(1, execs[pc]) * (LOOP_WEIGHT if in_loop else 1)
+                    target = "${:02X}".format(operand) if operand < 0x100 \
+                        else "${:04X}".format(operand)
+                    patterns.append((cycles * weight, "rmw", pc, pc + size - 1,
+                                     "{} {}{}{} ({} cycles)".format(
+                                         mnem, target,
+                                         {"zpx": ",X", "absx": ",X"}.get(mode, ""),
+                                         " in loop" if in_loop else "", cycles)))
+
+        patterns.sort(key=lambda p: (-p[0], p[2]))
+        return patterns
+
+    # -- region detection --------------------------------------------------
+
+    def build_regions(self, start=None, end=None):
+        """Return sorted list of (start, end, type) regions.
+
+        Regions are the runs of equal type code, found by a regex scan over
+        the translated flags rather than a per-address loop.
+        """
+        if not self.counters.touched():
+            return []
+        start = self.load_addr if start is None else start
+        end = self.end_addr if end is None else end
+        types = self.type_codes(start, end)
+        return [(start + m.start(), start + m.end() - 1,
+                 _TYPE_NAMES[types[m.start()]])
+                for m in _TYPE_RUN.finditer(types)]
+
+    def region_summary(self, start=None, end=None):
+        """Return regions with their totals and distinct caller counts.
+
+        Each entry is (start, end, type, reads, writes, execs, callers).
+        Totals come from prefix sums built once over the range, so each
+        region costs O(1); caller counts take one pass over the CSR slice.
+        """
+        start = self.load_addr if start is None else start
+        end = self.end_addr if end is None else end
+        regions = self.build_regions(start, end)
+        if not regions:
+            return []
+        c = self.counters
+        sums = [array("Q", accumulate(col[start:end + 1], initial=0))
+                for col in (c.reads, c.writes, c.execs)]
+        offsets, sources = c.caller_index()
+        result = []
+        for lo, hi, rtype in regions:
+            i, j = lo - start, hi - start + 1
+            reads, writes, execs = (p[j] - p[i] for p in sums)
+            callers = len(set(sources[offsets[lo]:offsets[hi + 1]]))
+            result.append((lo, hi, rtype, reads, writes, execs, callers))
+        return result
 
     # -- hotspot detection -------------------------------------------------
 
     def top_hot_code(self, n=20):
         """Return top *n* addresses by exec_count, only code addresses."""
-        code_addrs = [(a, inf) for a, inf in self.info.items()
-                      if inf.is_code and inf.exec_count > 0]
-        code_addrs.sort(key=lambda x: x[1].exec_count, reverse=True)
-        return code_addrs[:n]
+        execs = self.counters.execs
+        hot = heapq.nlargest(
+            n, (a for a in range(ADDR_SPACE) if execs[a]),
+            key=lambda a: (execs[a], -a))
+        return [(a, self.addr_info(a)) for a in hot]
 
     # -- zero-page summary -------------------------------------------------
 
+    def _accessed(self, start, end):
+        flags = self.counters.flags
+        return [a for a in range(start, end + 1)
+                if flags[a] & (FLAG_READ | FLAG_WRITE)]
+
     def zp_summary(self):
         """Return list of (addr, info) for accessed zero-page locations."""
-        result = []
-        for a in range(0x00, 0x100):
-            inf = self.info.get(a)
-            if inf and (inf.read_count or inf.write_count):
-                result.append((a, inf))
-        return result
+        return [(a, self.addr_info(a)) for a in self._accessed(0x00, 0xFF)]
 
     # -- I/O summary -------------------------------------------------------
 
     def io_summary(self):
         """Return list of (addr, hw_name, info) for accessed I/O."""
-        result = []
-        for a in range(0xC000, 0xC100):
-            inf = self.info.get(a)
-            if inf and (inf.read_count or inf.write_count):
-                name = HARDWARE.get(a, "UNKNOWN_IO")
-                result.append((a, name, inf))
-        return result
+        return [(a, HARDWARE.get(a, "UNKNOWN_IO"), self.addr_info(a))
+                for a in self._accessed(0xC000, 0xC0FF)]
+
+    # -- whole address space ---------------------------------------------
+
+    def page_summary(self):
+        """Return 256 tuples (page, reads, writes, execs, code, data).
+
+        One prefix-sum pass per counter column over the full 64 KB gives
+        every page total by subtraction; code/data byte counts come from
+        the translated flags.
+        """
+        c = self.counters
+        sums = [array("Q", accumulate(col, initial=0))
+                for col in (c.reads, c.writes, c.execs)]
+        types = self.type_codes(0, ADDR_SPACE - 1)
+        pages = []
+        for page in range(256):
+            lo, hi = page << 8, (page + 1) << 8
+            reads, writes, execs = (p[hi] - p[lo] for p in sums)
+            pages.append((page, reads, writes, execs,
+                          types.count(TYPE_CODE, lo, hi),
+                          types.count(TYPE_DATA, lo, hi)))
+        return pages
+
+    def soft_switch_notes(self):
+        """Describe bank / display state implied by soft-switch accesses."""
+        flags = self.counters.flags
+        hit = [a for a in range(0xC000, 0xC100)
+               if flags[a] & (FLAG_READ | FLAG_WRITE)]
+        notes = []
+        lc = [HARDWARE.get(a, "${:04X}".format(a)) for a in hit if a in LC_SWITCHES]
+        if lc:
+            notes.append("Language card switched ({}): $D000-$FFFF may be "
+                         "bank-switched RAM, not ROM".format(", ".join(lc)))
+        if 0xC054 in hit and 0xC055 in hit:
+            notes.append("LOWSCR and HISCR both used: HGR page flipping "
+                         "between $2000 and $4000")
+        elif 0xC055 in hit:
+            notes.append("HISCR used: HGR page 2 ($4000-$5FFF) displayed")
+        if 0xC057 in hit:
+            notes.append("HIRES selected")
+        return notes
+
+    # -- statistics --------------------------------------------------------
+
+    def code_byte_count(self):
+        return self.type_codes(0, ADDR_SPACE - 1).count(TYPE_CODE)
+
+    def data_ref_count(self):
+        return self.type_codes(0, ADDR_SPACE - 1).count(TYPE_DATA)
 
 
 # ---------------------------------------------------------------------------
@@ -634,30 +1351,20 @@ def report_text(analyzer, filename):
             print("${:04X} {:20s} : {}".format(addr, name, ", ".join(parts)))
 
     # -- Memory Map --
-    regions = analyzer.build_regions()
+    regions = analyzer.region_summary()
     if regions:
         print()
         print("=== Memory Map ===")
-        for start, end, rtype in regions:
+        for start, end, rtype, total_r, total_w, total_exec, n_callers in regions:
             size = end - start + 1
             detail = ""
             if rtype == "code":
-                # Count total exec and callers for the region
-                total_exec = sum(analyzer.info[a].exec_count
-                                 for a in range(start, end + 1))
-                all_callers = set()
-                for a in range(start, end + 1):
-                    all_callers.update(analyzer.info[a].callers)
                 if total_exec > 50:
                     detail = " (hot: {} executions, called from {} locations)".format(
-                        total_exec, len(all_callers))
-                elif all_callers:
-                    detail = " (called from {} locations)".format(len(all_callers))
+                        total_exec, n_callers)
+                elif n_callers:
+                    detail = " (called from {} locations)".format(n_callers)
             elif rtype == "data":
-                total_r = sum(analyzer.info[a].read_count
-                              for a in range(start, end + 1))
-                total_w = sum(analyzer.info[a].write_count
-                              for a in range(start, end + 1))
                 parts = []
                 if total_r:
                     parts.append("{} reads".format(total_r))
@@ -671,6 +1378,21 @@ def report_text(analyzer, filename):
             print("${:04X}-${:04X} : {:7s} [{:5d} bytes]{}".format(
                 start, end, rtype.upper(), size, detail))
 
+    # -- Resolved indirect accesses --
+    targets = analyzer.pointer_targets
+    if targets:
+        print()
+        print("=== Indirect Access Targets ===")
+        for pc in sorted(targets):
+            mnem, mode, zp, ranges = targets[pc]
+            spans = ", ".join(
+                "${:04X}-${:04X} ({})".format(lo, hi, area_name(lo))
+                for lo, hi in ranges[:4])
+            more = " +{} more".format(len(ranges) - 4) if len(ranges) > 4 else ""
+            operand = "(${:02X}),Y".format(zp) if mode == "indy" else \
+                "(${:02X},X)".format(zp)
+            print("${:04X} {} {} -> {}{}".format(pc, mnem, operand, spans, more))
+
     # -- Top Hot Addresses --
     hot = analyzer.top_hot_code(20)
     if hot:
@@ -683,9 +1405,8 @@ def report_text(analyzer, filename):
                 addr, inf.exec_count, sub_tag, br_tag))
 
     # -- Statistics --
-    total_code = sum(1 for a in analyzer.info.values() if a.is_code)
-    total_data = sum(1 for a in analyzer.info.values()
-                     if not a.is_code and (a.read_count or a.write_count))
+    total_code = analyzer.code_byte_count()
+    total_data = analyzer.data_ref_count()
     print()
     print("=== Statistics ===")
     print("Code bytes:    {}".format(total_code))
@@ -694,15 +1415,143 @@ def report_text(analyzer, filename):
     print("Branch targets:{}".format(len(analyzer.branch_targets)))
 
 
+# ---------------------------------------------------------------------------
+# Output: access-pattern report
+# ---------------------------------------------------------------------------
+PATTERN_TITLES = {
+    "poll": "Polling loops on soft switches",
+    "switch-loop": "Loops hammering soft switches (e.g. SPKR toggles)",
+    "strided": "Strided table walks",
+    "rmw": "Read-modify-write hot spots",
+}
+
+
+def report_patterns(patterns, limit=15):
+    """Print detected access patterns grouped by kind, costliest first."""
+    print()
+    print("=== Access Patterns (ranked by estimated cycles) ===")
+    if not patterns:
+        print("None found")
+        return
+    for kind, title in PATTERN_TITLES.items():
+        found = [p for p in patterns if p[1] == kind]
+        if not found:
+            continue
+        print()
+        print("{} ({}):".format(title, len(found)))
+        for cost, _, start, end, detail in found[:limit]:
+            print("  ${:04X}-${:04X} : {:7d} cycles  {}".format(
+                start, end, cost, detail))
+
+
+# ---------------------------------------------------------------------------
+# Output: per-frame report
+# ---------------------------------------------------------------------------
+def report_frames(frames, budget=CYCLES_PER_FRAME):
+    """Print cycle distribution, worst frames and hot-spot drift."""
+    frames = list(frames)
+    if not frames:
+        print("No frames in trace")
+        return
+    cycles = sorted(f.cycles for f in frames)
+    over = sum(1 for c in cycles if c > budget)
+
+    print()
+    print("=== Frame Profile (last {} frames) ===".format(len(frames)))
+    print("Frames {}..{}, budget {} cycles/frame".format(
+        frames[0].index, frames[-1].index, budget))
+    print("Cycles: min {}, median {}, p95 {}, max {}".format(
+        cycles[0], cycles[len(cycles) // 2],
+        cycles[min(len(cycles) - 1, len(cycles) * 95 // 100)], cycles[-1]))
+    print("Over budget: {} of {} frames".format(over, len(frames)))
+
+    # Histogram in tenths of the frame budget
+    buckets = {}
+    for c in cycles:
+        b = min(c * 10 // budget, 20)
+        buckets[b] = buckets.get(b, 0) + 1
+    peak = max(buckets.values())
+    for b in sorted(buckets):
+        label = ">=200%" if b == 20 else "{:3d}%-{:3d}%".format(b * 10, b * 10 + 9)
+        print("  {:>10s} : {:5d} {}".format(
+            label, buckets[b], "#" * max(1, buckets[b] * 40 // peak)))
+
+    print()
+    print("=== Worst Frames ===")
+    for f in sorted(frames, key=lambda f: -f.cycles)[:5]:
+        top = ", ".join("${:04X} {}".format(a, c) for a, c in f.top_routines(3))
+        print("Frame {:6d}: {:6d} cycles, {:5d} instr, {} R / {} W  [{}]".format(
+            f.index, f.cycles, f.instructions, f.reads, f.writes, top))
+
+    # Hot-spot drift: first quarter vs last quarter of the window
+    if len(frames) >= 8:
+        quarter = len(frames) // 4
+        print()
+        print("=== Hot Routines: early vs late frames ===")
+        for label, part in (("early", frames[:quarter]), ("late", frames[-quarter:])):
+            totals = {}
+            for f in part:
+                for a, c in f.routines.items():
+                    totals[a] = totals.get(a, 0) + c
+            top = sorted(totals.items(), key=lambda x: (-x[1], x[0]))[:5]
+            print("{:5s}: {}".format(label, ", ".join(
+                "${:04X} {}/frame".format(a, c // len(part)) for a, c in top)))
+
+
+# ---------------------------------------------------------------------------
+# Output: whole address space page map
+# ---------------------------------------------------------------------------
+def report_pages(analyzer):
+    """Print a per-area and per-page overview of all 64 KB."""
+    pages = analyzer.page_summary()
+    lc_used = any(analyzer.counters.flags[a] for a in LC_SWITCHES)
+
+    print()
+    print("=== Address Space Overview ===")
+    for start, end, name in MEMORY_AREAS:
+        if start >= 0xD000 and lc_used:
+            name = name.replace("ROM / ", "")
+        rows = pages[start >> 8:(end >> 8) + 1]
+        reads = sum(p[1] for p in rows)
+        writes = sum(p[2] for p in rows)
+        execs = sum(p[3] for p in rows)
+        code = sum(p[4] for p in rows)
+        detail = "{} reads, {} writes, {} code bytes".format(reads, writes, code)
+        stack_ops = 0
+        if start == 0x0100:
+            stack_ops = analyzer.stack_pushes + analyzer.stack_pulls
+            if stack_ops:
+                detail += ", {} bytes pushed, {} pulled".format(
+                    analyzer.stack_pushes, analyzer.stack_pulls)
+        active = "" if reads or writes or execs or stack_ops else " (untouched)"
+        print("${:04X}-${:04X} {:22s}: {}{}".format(
+            start, end, name, detail, active))
+
+    for note in analyzer.soft_switch_notes():
+        print("  * " + note)
+
+    print()
+    print("=== Page Map (active pages) ===")
+    peak = max((p[1] + p[2] + p[3] for p in pages), default=0) or 1
+    for page, reads, writes, execs, code, data in pages:
+        total = reads + writes + execs
+        if not total:
+            continue
+        bar = "#" * max(1, total * 30 // peak)
+        print("${:02X}xx : R {:5d}  W {:5d}  X {:5d}  code {:3d}  data {:3d}  {}".format(
+            page, reads, writes, execs, code, data, bar))
+
+
 # ---------------------------------------------------------------------------
 # Output: CSV export
 # ---------------------------------------------------------------------------
 def export_csv(analyzer, csv_path):
     """Write one row per address in the binary range."""
+    c = analyzer.counters
+    types = analyzer.type_codes(0, ADDR_SPACE - 1)
     with open(csv_path, "w") as f:
         f.write("address,type,read_count,write_count,exec_count,notes\n")
         for addr in range(analyzer.load_addr, analyzer.end_addr + 1):
-            inf = analyzer.info.get(addr, AddrInfo())
             notes_parts = []
             hw = HARDWARE.get(addr)
             if hw:
@@ -719,12 +1568,81 @@ def export_csv(analyzer, csv_path):
             if "," in notes_str or '"' in notes_str:
                 notes_str = '"' + notes_str.replace('"', '""') + '"'
             f.write("${:04X},{},{},{},{},{}\n".format(
-                addr, inf.type_str(),
-                inf.read_count, inf.write_count, inf.exec_count,
+                addr, _TYPE_NAMES[types[addr]],
+                c.reads[addr], c.writes[addr], c.execs[addr],
                 notes_str))
     print("CSV exported to {}".format(csv_path))
 
 
+# ---------------------------------------------------------------------------
+# Output: columnar export
+# ---------------------------------------------------------------------------
+COLUMN_NAMES = ("address", "reads", "writes", "execs", "flags")
+CSV_CHUNK_ROWS = 4096
+
+
+def _caller_edges(analyzer, start, end):
+    """Return (targets, sources) arrays for caller edges into start..end."""
+    offsets, sources = analyzer.counters.caller_index()
+    targets = array("H")
+    for a in range(start, end + 1):
+        n = offsets[a + 1] - offsets[a]
+        if n:
+            targets.extend(array("H", [a]) * n)
+    return targets, sources[offsets[start]:offsets[end + 1]]
+
+
+def export_columns(analyzer, base_path, start=None, end=None, use_numpy=True):
+    """Export counters and caller edges as columns.
+
+    With NumPy available this writes ``<base>.npz`` (address, reads,
+    writes, execs, flags) and ``<base>_edges.npz`` (target, source) as
+    fixed-width binary arrays; otherwise ``<base>.csv`` and
+    ``<base>_edges.csv`` are written in buffered chunks.  Flag bits are
+    FLAG_CODE=1, FLAG_READ=2, FLAG_WRITE=4.  Returns the paths written.
+    """
+    start = analyzer.load_addr if start is None else start
+    end = analyzer.end_addr if end is None else end
+    c = analyzer.counters
+    columns = (array("H", range(start, end + 1)),
+               c.reads[start:end + 1], c.writes[start:end + 1],
+               c.execs[start:end + 1], array("B", c.flags[start:end + 1]))
+    targets, sources = _caller_edges(analyzer, start, end)
+
+    np = None
+    if use_numpy:
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+
+    base = str(base_path)
+    if np is not None:
+        paths = (base + ".npz", base + "_edges.npz")
+        np.savez(paths[0], **{name: np.frombuffer(col, dtype=col.typecode)
+                              for name, col in zip(COLUMN_NAMES, columns)})
+        np.savez(paths[1], target=np.frombuffer(targets, dtype=np.uint16),
+                 source=np.frombuffer(sources, dtype=np.uint16))
+    else:
+        paths = (base + ".csv", base + "_edges.csv")
+        _write_csv_chunks(paths[0], COLUMN_NAMES, columns)
+        _write_csv_chunks(paths[1], ("target", "source"), (targets, sources))
+    for path in paths:
+        print("Columns exported to {}".format(path))
+    return paths
+
+
+def _write_csv_chunks(path, names, columns):
+    """Write equal-length integer columns as CSV, CSV_CHUNK_ROWS at a time."""
+    with open(path, "w") as f:
+        f.write(",".join(names) + "\n")
+        rows = len(columns[0])
+        for lo in range(0, rows, CSV_CHUNK_ROWS):
+            hi = min(rows, lo + CSV_CHUNK_ROWS)
+            chunk = zip(*(col[lo:hi] for col in columns))
+            f.write("".join(",".join(map(str, row)) + "\n" for row in chunk))
+
+
 # ---------------------------------------------------------------------------
 # Output: HTML heatmap
 # ---------------------------------------------------------------------------
@@ -734,16 +1652,12 @@ def export_html(analyzer, html_path, filename):
     end = analyzer.end_addr
     size = len(analyzer.code)
 
+    c = analyzer.counters
+    types = analyzer.type_codes(0, ADDR_SPACE - 1)
+
     # Pre-compute max counts for normalization
-    max_exec = max((analyzer.info[a].exec_count
-                    for a in range(load, end + 1)), default=1) or 1
-    max_read = 1
-    max_write = 1
-    for a in analyzer.info.values():
-        if a.read_count > max_read:
-            max_read = a.read_count
-        if a.write_count > max_write:
-            max_write = a.write_count
+    max_exec = max(c.execs[load:end + 1], default=1) or 1
+    max_read = max(1, max(c.reads))
 
     # Build cell data
     rows_html = []
@@ -757,39 +1671,42 @@ def export_html(analyzer, html_path, filename):
                 addr += 1
                 continue
 
-            inf = analyzer.info.get(addr, AddrInfo())
+            reads = c.reads[addr]
+            writes = c.writes[addr]
+            execs = c.execs[addr]
+            kind = types[addr]
             off = addr - load
             byte_val = analyzer.code[off] if off < size else 0
 
             # Determine color class and brightness
             is_io = 0xC000 <= addr <= 0xC0FF
-            if is_io and (inf.read_count or inf.write_count):
+            if is_io and (reads or writes):
                 css_class = "io"
-                intensity = min(1.0, (inf.read_count + inf.write_count) / max(max_read, 1) * 2)
-            elif inf.is_code:
-                if inf.exec_count > max_exec * 0.5:
+                intensity = min(1.0, (reads + writes) / max(max_read, 1) * 2)
+            elif kind == TYPE_CODE:
+                if execs > max_exec * 0.5:
                     css_class = "hot"
-                    intensity = min(1.0, inf.exec_count / max_exec)
+                    intensity = min(1.0, execs / max_exec)
                 else:
                     css_class = "code"
-                    intensity = max(0.25, min(1.0, inf.exec_count / max_exec))
-            elif inf.read_count or inf.write_count:
+                    intensity = max(0.25, min(1.0, execs / max_exec))
+            elif kind == TYPE_DATA:
                 css_class = "data"
                 intensity = max(0.25, min(1.0,
-                    (inf.read_count + inf.write_count) / max(max_read, 1)))
+                    (reads + writes) / max(max_read, 1)))
             else:
                 css_class = "unused"
                 intensity = 0.15
 
             # Build tooltip
             tip_parts = ["${:04X}: ${:02X}".format(addr, byte_val)]
-            tip_parts.append("Type: {}".format(inf.type_str()))
-            if inf.exec_count:
-                tip_parts.append("Exec: {}".format(inf.exec_count))
-            if inf.read_count:
-                tip_parts.append("Read: {}".format(inf.read_count))
-            if inf.write_count:
-                tip_parts.append("Write: {}".format(inf.write_count))
+            tip_parts.append("Type: {}".format(_TYPE_NAMES[kind]))
+            if execs:
+                tip_parts.append("Exec: {}".format(execs))
+            if reads:
+                tip_parts.append("Read: {}".format(reads))
+            if writes:
+                tip_parts.append("Write: {}".format(writes))
             hw = HARDWARE.get(addr)
             if hw:
                 tip_parts.append("HW: {}".format(hw))
@@ -817,10 +1734,8 @@ def export_html(analyzer, html_path, filename):
     table_body = "\n".join(rows_html)
 
     # Statistics for the header
-    total_code = sum(1 for a in range(load, end + 1)
-                     if analyzer.info.get(a, AddrInfo()).is_code)
-    total_data_refs = sum(1 for a in analyzer.info.values()
-                          if not a.is_code and (a.read_count or a.write_count))
+    total_code = types[load:end + 1].count(TYPE_CODE)
+    total_data_refs = analyzer.data_ref_count()
 
     html_content = """<!DOCTYPE html>
 <html lang="en">
@@ -945,6 +1860,533 @@ td.empty  {{ background: transparent; border: none; }}
     print("HTML heatmap exported to {}".format(html_path))
 
 
+# ---------------------------------------------------------------------------
+# Output: canvas heatmap (virtualized)
+# ---------------------------------------------------------------------------
+def _column_b64(column):
+    """Encode a counter column as base64 in the narrowest unsigned width.
+
+    Returns [width_in_bytes, base64]; the page picks the matching JS
+    typed array (little-endian, as every browser platform is).
+    """
+    top = max(column, default=0)
+    typecode = "B" if top < 0x100 else "H" if top < 0x10000 else "I"
+    narrow = array(typecode, column)
+    if sys.byteorder != "little":
+        narrow.byteswap()
+    return [narrow.itemsize, base64.b64encode(narrow.tobytes()).decode("ascii")]
+
+
+def export_heatmap(analyzer, html_path, filename, start=None, end=None):
+    """Write a compact canvas heatmap covering start..end.
+
+    The counters, flags and memory bytes are embedded once as base64 typed
+    arrays; the page draws only the rows in view and builds tooltips on
+    hover, so even a full 64 KB dump stays small and responsive.
+    """
+    start = analyzer.load_addr if start is None else start
+    end = analyzer.end_addr if end is None else end
+    c = analyzer.counters
+
+    image = bytearray(end - start + 1)
+    lo = max(start, analyzer.load_addr)
+    hi = min(end, analyzer.end_addr)
+    if lo <= hi:
+        image[lo - start:hi - start + 1] = \
+            analyzer.code[lo - analyzer.load_addr:hi - analyzer.load_addr + 1]
+
+    data = {
+        "start": start,
+        "reads": _column_b64(c.reads[start:end + 1]),
+        "writes": _column_b64(c.writes[start:end + 1]),
+        "execs": _column_b64(c.execs[start:end + 1]),
+        "flags": _column_b64(c.flags[start:end + 1]),
+        "bytes": _column_b64(image),
+        "hw": {str(a): n for a, n in HARDWARE.items() if start <= a <= end},
+        "zp": {str(a): n for a, n in ZP_NAMES.items() if start <= a <= end},
+        "subs": sorted(a for a in analyzer.subroutines if start <= a <= end),
+        "branches": sorted(a for a in analyzer.branch_targets if start <= a <= end),
+        "pages": None,
+    }
+    if start == 0 and end == ADDR_SPACE - 1:
+        data["pages"] = [p[1] + p[2] + p[3] for p in analyzer.page_summary()]
+
+    html_content = HEATMAP_TEMPLATE.replace(
+        "%TITLE%", html_module.escape(filename)).replace(
+        "%META%", "Range: ${:04X}-${:04X}, {} bytes".format(
+            start, end, end - start + 1)).replace(
+        "%DATA%", json.dumps(data, separators=(",", ":")))
+
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(html_content)
+    print("Canvas heatmap exported to {}".format(html_path))
+
+
+HEATMAP_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Memory Access Heatmap - %TITLE%</title>
+<style>
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
+    font-family: 'Consolas', 'Courier New', monospace;
+    background: #1a1a2e;
+    color: #e0e0e0;
+    padding: 20px;
+}
+h1 { color: #c8d6e5; margin-bottom: 4px; font-size: 1.3em; }
+.meta { color: #8899aa; font-size: 0.85em; margin-bottom: 16px; }
+#view { position: relative; height: 80vh; overflow-y: auto; width: 520px; }
+#spacer { width: 1px; }
+#pages { display: block; margin-bottom: 12px; cursor: pointer; }
+#map { position: sticky; top: 0; display: block; }
+#tip {
+    position: fixed;
+    pointer-events: none;
+    background: #222;
+    border: 1px solid #555;
+    padding: 4px 6px;
+    font-size: 11px;
+    display: none;
+    white-space: nowrap;
+}
+</style>
+</head>
+<body>
+<h1>Memory Access Heatmap</h1>
+<div class="meta">%TITLE% &mdash; %META%</div>
+<canvas id="pages"></canvas>
+<div id="view"><canvas id="map"></canvas><div id="spacer"></div></div>
+<div id="tip"></div>
+<script>
+const D = %DATA%;
+function col([width, b64]) {
+    const s = atob(b64), u = new Uint8Array(s.length);
+    for (let i = 0; i < s.length; i++) u[i] = s.charCodeAt(i);
+    const T = {1: Uint8Array, 2: Uint16Array, 4: Uint32Array}[width];
+    return new T(u.buffer);
+}
+const reads = col(D.reads), writes = col(D.writes), execs = col(D.execs);
+const flags = col(D.flags), bytes = col(D.bytes);
+const subs = new Set(D.subs), branches = new Set(D.branches);
+const N = bytes.length, COLS = 16, CW = 28, CH = 16, LW = 56;
+const ROWS = Math.ceil(N / COLS);
+let maxExec = 1, maxRead = 1;
+for (let i = 0; i < N; i++) {
+    if (execs[i] > maxExec) maxExec = execs[i];
+    if (reads[i] > maxRead) maxRead = reads[i];
+}
+const hex = (v, n) => v.toString(16).toUpperCase().padStart(n, "0");
+function cell(i) {
+    const a = D.start + i, rw = reads[i] + writes[i];
+    if (a >= 0xC000 && a <= 0xC0FF && rw)
+        return ["#e74c3c", Math.min(1, rw / maxRead * 2)];
+    if (flags[i] & 1) {
+        if (execs[i] > maxExec * 0.5) return ["#f1c40f", Math.min(1, execs[i] / maxExec)];
+        return ["#2a6fdb", Math.max(0.25, Math.min(1, execs[i] / maxExec))];
+    }
+    if (rw) return ["#27ae60", Math.max(0.25, Math.min(1, rw / maxRead))];
+    return ["#333", 0.15];
+}
+const view = document.getElementById("view"), canvas = document.getElementById("map");
+const spacer = document.getElementById("spacer"), tip = document.getElementById("tip");
+const ctx = canvas.getContext("2d");
+canvas.width = LW + COLS * CW;
+spacer.style.height = (ROWS * CH) + "px";
+function draw() {
+    canvas.height = view.clientHeight;
+    spacer.style.marginTop = (-canvas.height) + "px";
+    const first = Math.floor(view.scrollTop / CH), shift = view.scrollTop % CH;
+    const count = Math.ceil(canvas.height / CH) + 1;
+    ctx.font = "10px monospace";
+    ctx.textBaseline = "middle";
+    for (let r = 0; r < count && first + r < ROWS; r++) {
+        const y = r * CH - shift, row = first + r;
+        ctx.fillStyle = "#8899aa";
+        ctx.fillText("$" + hex(D.start + row * COLS, 4), 2, y + CH / 2);
+        for (let c = 0; c < COLS; c++) {
+            const i = row * COLS + c;
+            if (i >= N) break;
+            const [color, alpha] = cell(i);
+            ctx.globalAlpha = Math.max(0.15, alpha);
+            ctx.fillStyle = color;
+            ctx.fillRect(LW + c * CW, y, CW - 1, CH - 1);
+            ctx.globalAlpha = 1;
+            ctx.fillStyle = "#ddd";
+            ctx.fillText(hex(bytes[i], 2), LW + c * CW + 7, y + CH / 2);
+        }
+    }
+}
+function describe(i) {
+    const a = D.start + i, parts = ["$" + hex(a, 4) + ": $" + hex(bytes[i], 2)];
+    parts.push("Type: " + ((flags[i] & 1) ? "code" : (reads[i] || writes[i]) ? "data" : "unknown"));
+    if (execs[i]) parts.push("Exec: " + execs[i]);
+    if (reads[i]) parts.push("Read: " + reads[i]);
+    if (writes[i]) parts.push("Write: " + writes[i]);
+    if (D.hw[a]) parts.push("HW: " + D.hw[a]);
+    if (D.zp[a]) parts.push("ZP: " + D.zp[a]);
+    if (subs.has(a)) parts.push("[SUBROUTINE]");
+    if (branches.has(a)) parts.push("[BRANCH TARGET]");
+    return parts.join(" | ");
+}
+canvas.addEventListener("mousemove", e => {
+    const rect = canvas.getBoundingClientRect();
+    const x = e.clientX - rect.left - LW, y = e.clientY - rect.top + view.scrollTop % CH;
+    const c = Math.floor(x / CW), i = (Math.floor(view.scrollTop / CH) + Math.floor(y / CH)) * COLS + c;
+    if (x < 0 || c >= COLS || i >= N) { tip.style.display = "none"; return; }
+    tip.textContent = describe(i);
+    tip.style.left = (e.clientX + 12) + "px";
+    tip.style.top = (e.clientY + 12) + "px";
+    tip.style.display = "block";
+});
+canvas.addEventListener("mouseleave", () => { tip.style.display = "none"; });
+if (D.pages) {
+    // 16x16 page overview; click a page to jump to it
+    const pc = document.getElementById("pages"), pctx = pc.getContext("2d"), PS = 22;
+    const peak = Math.max(1, ...D.pages);
+    pc.width = pc.height = 16 * PS;
+    pctx.font = "8px monospace";
+    D.pages.forEach((t, p) => {
+        pctx.fillStyle = t ? "rgba(241,196,15," + Math.max(0.2, t / peak) + ")" : "#333";
+        pctx.fillRect((p % 16) * PS, Math.floor(p / 16) * PS, PS - 1, PS - 1);
+        pctx.fillStyle = "#ddd";
+        pctx.fillText(hex(p, 2), (p % 16) * PS + 5, Math.floor(p / 16) * PS + 13);
+    });
+    pc.addEventListener("click", e => {
+        const r = pc.getBoundingClientRect();
+        const p = Math.floor((e.clientY - r.top) / PS) * 16 + Math.floor((e.clientX - r.left) / PS);
+        view.scrollTop = (p * 256 / COLS) * CH;
+    });
+    pc.addEventListener("mousemove", e => {
+        const r = pc.getBoundingClientRect();
+        const p = Math.floor((e.clientY - r.top) / PS) * 16 + Math.floor((e.clientX - r.left) / PS);
+        pc.title = "$" + hex(p, 2) + "00: " + D.pages[p] + " accesses";
+    });
+}
+view.addEventListener("scroll", () => requestAnimationFrame(draw));
+window.addEventListener("resize", draw);
+draw();
+</script>
+</body>
+</html>
+"""
+
+
+# ---------------------------------------------------------------------------
+# Differential analysis
+# ---------------------------------------------------------------------------
+class AccessDiff:
+    """Per-address deltas between two analyses (new minus old).
+
+    ``mapping[a]`` is the old address aligned with new address *a*, or -1
+    when *a* has no counterpart.  By default addresses align one-to-one;
+    with byte alignment, code inside the new image is matched against
+    the old image with difflib so shifted routines still line up.
+    """
+
+    def __init__(self, old, new, align_bytes=False):
+        self.old = old
+        self.new = new
+        self.mapping = array("l", range(ADDR_SPACE))
+        self.matched = None
+        if align_bytes:
+            self._align(old, new)
+
+        self.deltas = {}
+        for name in ("reads", "writes", "execs"):
+            ncol = getattr(new.counters, name)
+            ocol = getattr(old.counters, name)
+            aligned = [ocol[m] if m >= 0 else 0 for m in self.mapping]
+            self.deltas[name] = array("l", map(operator.sub, ncol, aligned))
+        self.total = array("l", map(lambda r, w, x: abs(r) + abs(w) + abs(x),
+                                    self.deltas["reads"], self.deltas["writes"],
+                                    self.deltas["execs"]))
+
+    def _align(self, old, new):
+        matcher = difflib.SequenceMatcher(None, old.code, new.code, autojunk=False)
+        for a in range(new.load_addr, new.end_addr + 1):
+            self.mapping[a & 0xFFFF] = -1
+        self.matched = 0
+        for i, j, n in matcher.get_matching_blocks():
+            for k in range(n):
+                self.mapping[(new.load_addr + j + k) & 0xFFFF] = \
+                    (old.load_addr + i + k) & 0xFFFF
+            self.matched += n
+
+    def region_deltas(self, start=None, end=None):
+        """Regions of the new analysis with net and absolute deltas.
+
+        Returns (start, end, type, d_reads, d_writes, d_execs, abs_total)
+        per region, from prefix sums over the delta columns.
+        """
+        start = self.new.load_addr if start is None else start
+        end = self.new.end_addr if end is None else end
+        sums = [array("q", accumulate(col[start:end + 1], initial=0))
+                for col in (self.deltas["reads"], self.deltas["writes"],
+                            self.deltas["execs"], self.total)]
+        result = []
+        for lo, hi, rtype in self.new.build_regions(start, end):
+            i, j = lo - start, hi - start + 1
+            result.append((lo, hi, rtype) + tuple(p[j] - p[i] for p in sums))
+        return result
+
+    def top_addresses(self, n=20):
+        total = self.total
+        return heapq.nlargest(n, (a for a in range(ADDR_SPACE) if total[a]),
+                              key=lambda a: (total[a], -a))
+
+
+def report_diff(diff, old_name, new_name):
+    """Print the largest per-region and per-address changes."""
+    print()
+    print("=== Diff: {} -> {} ===".format(old_name, new_name))
+    if diff.matched is not None:
+        print("Byte alignment: {} of {} bytes matched".format(
+            diff.matched, len(diff.new.code)))
+    for name in ("reads", "writes", "execs"):
+        col = diff.deltas[name]
+        print("{:6s}: +{} / -{}".format(
+            name, sum(d for d in col if d > 0), -sum(d for d in col if d < 0)))
+
+    regions = [r for r in diff.region_deltas() if r[6]]
+    if regions:
+        print()
+        print("=== Changed Regions ===")
+        for lo, hi, rtype, dr, dw, dx, total in sorted(
+                regions, key=lambda r: -r[6])[:20]:
+            print("${:04X}-${:04X} : {:7s} R {:+5d}  W {:+5d}  X {:+5d}  "
+                  "(|delta| {})".format(lo, hi, rtype.upper(), dr, dw, dx, total))
+
+    top = diff.top_addresses()
+    if top:
+        print()
+        print("=== Largest Address Deltas ===")
+        for a in top:
+            old = diff.mapping[a]
+            where = "" if old == a else (" (old ${:04X})".format(old) if old >= 0
+                                         else " (new)")
+            print("${:04X}{} : R {:+d}  W {:+d}  X {:+d}".format(
+                a, where, diff.deltas["reads"][a], diff.deltas["writes"][a],
+                diff.deltas["execs"][a]))
+
+
+def export_diff_heatmap(diff, html_path, title, start=None, end=None):
+    """Write a canvas heatmap of deltas: green = more accesses, red = fewer."""
+    start = diff.new.load_addr if start is None else start
+    end = diff.new.end_addr if end is None else end
+    net = array("l", map(operator.add, diff.deltas["reads"][start:end + 1],
+                         map(operator.add, diff.deltas["writes"][start:end + 1],
+                             diff.deltas["execs"][start:end + 1])))
+    if sys.byteorder != "little":
+        net.byteswap()
+    data = {"start": start, "net": base64.b64encode(
+        array("i", net).tobytes()).decode("ascii")}
+    html_content = DIFF_TEMPLATE.replace(
+        "%TITLE%", html_module.escape(title)).replace(
+        "%DATA%", json.dumps(data, separators=(",", ":")))
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(html_content)
+    print("Diff heatmap exported to {}".format(html_path))
+
+
+DIFF_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Access Diff - %TITLE%</title>
+<style>
+body { font-family: 'Consolas', 'Courier New', monospace; background: #1a1a2e;
+       color: #e0e0e0; padding: 20px; }
+h1 { color: #c8d6e5; margin-bottom: 12px; font-size: 1.3em; }
+#tip { margin-top: 8px; color: #8899aa; font-size: 0.85em; height: 1.2em; }
+</style>
+</head>
+<body>
+<h1>Access Diff &mdash; %TITLE%</h1>
+<canvas id="map"></canvas>
+<div id="tip"></div>
+<script>
+const D = %DATA%;
+const s = atob(D.net), u = new Uint8Array(s.length);
+for (let i = 0; i < s.length; i++) u[i] = s.charCodeAt(i);
+const net = new Int32Array(u.buffer), N = net.length, COLS = 64, PX = 8;
+let peak = 1;
+for (const v of net) peak = Math.max(peak, Math.abs(v));
+const canvas = document.getElementById("map"), ctx = canvas.getContext("2d");
+canvas.width = COLS * PX;
+canvas.height = Math.ceil(N / COLS) * PX;
+for (let i = 0; i < N; i++) {
+    const v = net[i], a = Math.max(0.15, Math.abs(v) / peak);
+    ctx.fillStyle = v > 0 ? "rgba(39,174,96," + a + ")" :
+                    v < 0 ? "rgba(231,76,60," + a + ")" : "#2a2a3e";
+    ctx.fillRect((i % COLS) * PX, Math.floor(i / COLS) * PX, PX - 1, PX - 1);
+}
+canvas.addEventListener("mousemove", e => {
+    const r = canvas.getBoundingClientRect();
+    const i = Math.floor((e.clientY - r.top) / PX) * COLS + Math.floor((e.clientX - r.left) / PX);
+    if (i < 0 || i >= N) return;
+    document.getElementById("tip").textContent =
+        "$" + (D.start + i).toString(16).toUpperCase().padStart(4, "0") +
+        ": " + (net[i] > 0 ? "+" : "") + net[i] + " accesses";
+});
+</script>
+</body>
+</html>
+"""
+
+
+# ---------------------------------------------------------------------------
+# Query server
+# ---------------------------------------------------------------------------
+class QueryService:
+    """Answer JSON queries against a resident MemoryAnalyzer.
+
+    Requests are objects with a ``q`` field; addresses may be ints or
+    strings accepted by parse_address.  Everything a query needs is
+    precomputed here, so answers are lookups rather than re-analysis.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.regions = analyzer.region_summary(0, ADDR_SPACE - 1)
+        self.region_starts = [r[0] for r in self.regions]
+        self.hot = analyzer.top_hot_code(256)
+        self.handlers = {
+            "hot": self.q_hot,
+            "callers": self.q_callers,
+            "region": self.q_region,
+            "info": self.q_info,
+            "zp": self.q_zp,
+            "io": self.q_io,
+            "stats": self.q_stats,
+        }
+
+    @staticmethod
+    def _addr(req):
+        addr = req.get("addr")
+        if isinstance(addr, str):
+            addr = parse_address(addr)
+        if not isinstance(addr, int) or not 0 <= addr < ADDR_SPACE:
+            raise ValueError("addr must be 0..$FFFF")
+        return addr
+
+    def handle(self, req):
+        """Answer one decoded request; never raises."""
+        if not isinstance(req, dict):
+            return {"error": "bad request: request must be a JSON object"}
+        q = req.get("q")
+        if not isinstance(q, str):
+            return {"error": "bad request: q must be a string",
+                    "queries": sorted(self.handlers)}
+        handler = self.handlers.get(q)
+        if handler is None:
+            return {"error": "unknown query", "queries": sorted(self.handlers)}
+        try:
+            return {"q": q, "result": handler(req)}
+        except Exception as exc:
+            # One bad request must not take down the connection
+            return {"q": q, "error": "{}: {}".format(type(exc).__name__, exc)}
+
+    def q_hot(self, req):
+        n = int(req.get("n", 20))
+        return [{"addr": a, "exec": inf.exec_count} for a, inf in self.hot[:n]]
+
+    def q_callers(self, req):
+        return sorted(set(self.analyzer.counters.callers_of(self._addr(req))))
+
+    def q_region(self, req):
+        addr = self._addr(req)
+        i = bisect_right(self.region_starts, addr) - 1
+        start, end, rtype, reads, writes, execs, callers = self.regions[i]
+        return {"start": start, "end": end, "type": rtype, "reads": reads,
+                "writes": writes, "execs": execs, "callers": callers,
+                "area": area_name(addr)}
+
+    def q_info(self, req):
+        addr = self._addr(req)
+        inf = self.analyzer.addr_info(addr)
+        return {"addr": addr, "type": inf.type_str(), "reads": inf.read_count,
+                "writes": inf.write_count, "execs": inf.exec_count,
+                "callers": len(set(inf.callers)),
+                "name": HARDWARE.get(addr) or ZP_NAMES.get(addr)}
+
+    def q_zp(self, req):
+        return [{"addr": a, "reads": inf.read_count, "writes": inf.write_count,
+                 "name": ZP_NAMES.get(a)} for a, inf in self.analyzer.zp_summary()]
+
+    def q_io(self, req):
+        return [{"addr": a, "name": name, "reads": inf.read_count,
+                 "writes": inf.write_count}
+                for a, name, inf in self.analyzer.io_summary()]
+
+    def q_stats(self, req):
+        a = self.analyzer
+        return {"load": a.load_addr, "end": a.end_addr,
+                "code_bytes": a.code_byte_count(),
+                "data_refs": a.data_ref_count(),
+                "subroutines": len(a.subroutines),
+                "branch_targets": len(a.branch_targets)}
+
+
+def serve(analyzer, address):
+    """Serve newline-delimited JSON queries on *address* until interrupted.
+
+    *address* is ``HOST:PORT``, a bare ``PORT`` (localhost) or a Unix
+    socket path.  Each request line gets one response line; clients are
+    handled concurrently by asyncio.  A Unix socket file is removed on
+    shutdown.
+    """
+    import asyncio
+    import signal
+
+    service = QueryService(analyzer)
+
+    async def client(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                except ValueError as exc:
+                    reply = {"error": "bad request: {}".format(exc)}
+                else:
+                    reply = service.handle(req)
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    unix = ":" not in address and not address.isdigit()
+
+    async def run():
+        if unix:
+            server = await asyncio.start_unix_server(client, path=address)
+        else:
+            host, _, port = address.rpartition(":")
+            server = await asyncio.start_server(client, host or "127.0.0.1",
+                                                int(port))
+        print("Serving queries on {} (Ctrl-C to stop)".format(address))
+        async with server:
+            await server.serve_forever()
+
+    # Treat SIGTERM like Ctrl-C so the cleanup below also runs under kill
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # The listening socket file outlives the server; remove it
+        sock = Path(address)
+        if unix and sock.is_socket():
+            sock.unlink()
+
+
 # ---------------------------------------------------------------------------
 # Argument parsing
 # ---------------------------------------------------------------------------
@@ -961,6 +2403,33 @@ def parse_address(s):
     return int(s, 0)
 
 
+def run_analysis(analyzer, args, trace=None):
+    """Run the analysis selected on the command line; return trace frames.
+
+    A trace replaces the static passes: it records what actually executed,
+    so --entry is not traced statically on top of it.
+    """
+    if trace:
+        print("Replaying trace {}...".format(trace))
+        with open(trace) as f:
+            return analyzer.analyze_trace(
+                f,
+                frame_pc=parse_address(args.frame_pc) if args.frame_pc else None,
+                frame_write=parse_address(args.frame_write) if args.frame_write else None,
+                frame_access=parse_address(args.frame_access) if args.frame_access else None,
+                keep=args.frames)
+
+    if args.entry:
+        entry = parse_address(args.entry)
+        print("Flow analysis from entry point ${:04X}...".format(entry))
+        analyzer.analyze_flow(entry)
+        analyzer.analyze_pointers(entry)
+    else:
+        print("Linear analysis...")
+        analyzer.analyze_linear()
+    return None
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="6502 Memory Access Pattern Visualizer for Apple II binaries",
@@ -968,7 +2437,10 @@ def main():
                "  python memviz.py game.bin 0x4000\n"
                "  python memviz.py game.bin 0x4000 --html report.html\n"
                "  python memviz.py game.bin 0x4000 --csv data.csv\n"
-               "  python memviz.py game.bin 0x4000 --entry 0x57D7\n",
+               "  python memviz.py game.bin 0x4000 --heatmap map.html\n"
+               "  python memviz.py game.bin 0x4000 --entry 0x57D7\n"
+               "  python memviz.py game.bin 0x4000 --trace run.log --frame-pc 0x5875\n"
+               "  python memviz.py game.bin 0x4000 --entry 0x57D7 --serve 8765\n",
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument("binary", help="Path to the 6502 binary file")
@@ -976,12 +2448,66 @@ def main():
                         help="Load address (hex, default 0x0800)")
     parser.add_argument("--html", metavar="FILE",
                         help="Export HTML heatmap to FILE")
+    parser.add_argument("--heatmap", metavar="FILE",
+                        help="Export compact canvas heatmap to FILE "
+                             "(scales to full 64 KB dumps)")
+    parser.add_argument("--columns", metavar="BASE",
+                        help="Export counters and caller edges as columns: "
+                             "BASE.npz/BASE_edges.npz with NumPy, else "
+                             "BASE.csv/BASE_edges.csv")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Replay an execution trace (one PC per line) "
+                             "for dynamic counts and per-frame profiling")
+    parser.add_argument("--frame-pc", metavar="ADDR",
+                        help="With --trace: a new frame starts when PC "
+                             "reaches ADDR (e.g. $5875, the main loop)")
+    parser.add_argument("--frame-write", metavar="ADDR",
+                        help="With --trace: a new frame starts on a write "
+                             "to ADDR (e.g. a vsync frame counter)")
+    parser.add_argument("--frame-access", metavar="ADDR",
+                        help="With --trace: a new frame starts on any read "
+                             "or write of ADDR (e.g. $C055 page flip; soft "
+                             "switches toggle on reads)")
+    parser.add_argument("--frames", type=int, default=600, metavar="N",
+                        help="Frames kept in the ring buffer (default 600)")
+    parser.add_argument("--diff", metavar="OTHER",
+                        help="Compare against OTHER binary (old side), "
+                             "analyzed the same way")
+    parser.add_argument("--diff-load", metavar="ADDR",
+                        help="Load address of the --diff binary "
+                             "(default: same as load_address)")
+    parser.add_argument("--diff-trace", metavar="FILE",
+                        help="Old-side trace (requires --trace, so both "
+                             "sides are dynamic); with no --diff, compares "
+                             "two runs of the same binary")
+    parser.add_argument("--align", choices=("address", "bytes"),
+                        default="address",
+                        help="Align the two sides by address or by matching "
+                             "bytes (for shifted code)")
+    parser.add_argument("--diff-html", metavar="FILE",
+                        help="Export red/green diff heatmap to FILE")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="After analysis, answer JSON queries on "
+                             "HOST:PORT, PORT or a Unix socket path")
+    parser.add_argument("--patterns", action="store_true",
+                        help="Detect polling loops, strided table walks and "
+                             "RMW hot spots, ranked by estimated cycles")
+    parser.add_argument("--full", action="store_true",
+                        help="Report all 64 KB by page (HGR, stack, text, "
+                             "language card); --heatmap then covers "
+                             "$0000-$FFFF with a page overview")
     parser.add_argument("--csv", metavar="FILE",
                         help="Export CSV data to FILE")
     parser.add_argument("--entry", metavar="ADDR",
-                        help="Entry point for flow-based analysis (hex)")
+                        help="Entry point for flow-based analysis (hex); "
+                             "not used with --trace")
 
     args = parser.parse_args()
+    if args.diff_trace and not args.trace:
+        parser.error("--diff-trace requires --trace: both sides of a diff "
+                     "must use the same analysis")
+    if args.diff_html and not (args.diff or args.diff_trace):
+        parser.error("--diff-html requires --diff or --diff-trace")
 
     bin_path = Path(args.binary)
     if not bin_path.exists():
@@ -998,29 +2524,70 @@ def main():
     load_addr = parse_address(args.load_address)
 
     analyzer = MemoryAnalyzer(code, load_addr)
-
-    if args.entry:
-        entry = parse_address(args.entry)
-        print("Flow analysis from entry point ${:04X}...".format(entry))
-        analyzer.analyze_flow(entry)
-    else:
-        print("Linear analysis...")
-        analyzer.analyze_linear()
+    frames = run_analysis(analyzer, args, args.trace)
 
     # Always print text report
     print()
     report_text(analyzer, bin_path.name)
+    if frames is not None and (args.frame_pc or args.frame_write or
+                               args.frame_access):
+        report_frames(frames)
+    if args.full:
+        report_pages(analyzer)
+    if args.patterns:
+        report_patterns(analyzer.find_patterns())
+
+    # Optional differential analysis
+    if args.diff or args.diff_trace:
+        old_path = Path(args.diff) if args.diff else bin_path
+        if not old_path.exists():
+            print("Error: file not found: {}".format(old_path), file=sys.stderr)
+            sys.exit(1)
+        with open(old_path, "rb") as f:
+            old_code = f.read()
+        old_load = parse_address(args.diff_load) if args.diff_load else load_addr
+        old = MemoryAnalyzer(old_code, old_load)
+        print()
+        run_analysis(old, args, args.diff_trace or args.trace)
+        diff = AccessDiff(old, analyzer, align_bytes=args.align == "bytes")
+        report_diff(diff, old_path.name, bin_path.name)
+        if args.diff_html:
+            print()
+            export_diff_heatmap(diff, args.diff_html, "{} -> {}".format(
+                old_path.name, bin_path.name))
 
     # Optional HTML export
     if args.html:
         print()
         export_html(analyzer, args.html, bin_path.name)
 
+    # Optional canvas heatmap
+    if args.heatmap:
+        print()
+        if args.full:
+            export_heatmap(analyzer, args.heatmap, bin_path.name,
+                           0, ADDR_SPACE - 1)
+        else:
+            export_heatmap(analyzer, args.heatmap, bin_path.name)
+
+    # Optional columnar export
+    if args.columns:
+        print()
+        if args.full:
+            export_columns(analyzer, args.columns, 0, ADDR_SPACE - 1)
+        else:
+            export_columns(analyzer, args.columns)
+
     # Optional CSV export
     if args.csv:
         print()
         export_csv(analyzer, args.csv)
 
+    # Optional resident query server
+    if args.serve:
+        print()
+        serve(analyzer, args.serve)
+
 
 if __name__ == "__main__":
     main()